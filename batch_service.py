@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from config import settings
+from chatbot_service import ChatbotService
+from openai_client import get_async_openai_client
+
+logger = logging.getLogger(__name__)
+
+
+class BatchReasoningJob:
+    """Run chat completion prompts through the OpenAI Batch API.
+
+    Batch requests cost about half as much as interactive ones and don't count
+    against the interactive rate limits, but may take up to the completion
+    window to finish. Only use this for work nobody is waiting on.
+    """
+
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 250,
+        temperature: float = 0.7,
+        initial_poll_seconds: float = 10,
+        max_poll_seconds: float = 600
+    ):
+        self.client = client or get_async_openai_client()
+        self.model = model or settings.OPENAI_MODEL
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.initial_poll_seconds = initial_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+
+    def _build_input_file(self, prompts: List[str]) -> bytes:
+        lines = []
+        for i, prompt in enumerate(prompts):
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": self.max_tokens,
+                    "temperature": self.temperature
+                }
+            }))
+        return "\n".join(lines).encode("utf-8")
+
+    async def run(self, prompts: List[str]) -> List[Optional[str]]:
+        """Submit prompts as one batch and wait for the results.
+
+        Returns one entry per prompt, in order; None where that request failed.
+        """
+        if not prompts:
+            return []
+
+        input_file = await self.client.files.create(
+            file=("reasoning_batch.jsonl", self._build_input_file(prompts)),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %s requests", batch.id, len(prompts))
+
+        # Poll with exponential backoff
+        delay = self.initial_poll_seconds
+        while batch.status not in self.TERMINAL_STATUSES:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_seconds)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("Batch %s finished with status %s", batch.id, batch.status)
+            return [None] * len(prompts)
+
+        output = await self.client.files.content(batch.output_file_id)
+        results: Dict[int, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                continue
+            results[int(record["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+
+        return [results.get(i) for i in range(len(prompts))]
+
+
+async def submit_reasoning_batch(
+    chatbot: ChatbotService,
+    queries: List[str],
+    limit: int = 5,
+    job: Optional[BatchReasoningJob] = None
+) -> List[Optional[str]]:
+    """Precompute recommendation reasoning for queries and store it in the chatbot's cache.
+
+    Queries that need no LLM call (no or weak matches, already cached) are
+    skipped and return None, as do requests the batch failed to complete.
+    """
+    prepared = [await chatbot.prepare_reasoning_request(query, limit) for query in queries]
+    pending = [(i, request) for i, request in enumerate(prepared) if request is not None]
+
+    job = job or BatchReasoningJob()
+    outputs = await job.run([prompt for _, (_, prompt) in pending])
+
+    results: List[Optional[str]] = [None] * len(queries)
+    for (i, (cache_key, _)), reasoning in zip(pending, outputs):
+        if reasoning:
+            chatbot.store_reasoning(cache_key, reasoning)
+            results[i] = reasoning
+    return results
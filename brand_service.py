@@ -1,95 +1,323 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
+import logging
+import re
+import string
 import uuid
+import threading
 from datetime import datetime
+from urllib.parse import quote
 from models import Brand, BrandConfig
 from chatbot_service import ChatbotService
 from vector_store import VectorStore
 import os
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Delay before pending brand changes are written to disk, so bursts of
+# mutations are coalesced into a single write
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+_ID_SUFFIX_PATTERN = re.compile(r"(.+)-(\d+)$")
+
+# Default prompts; brand-specific fields are filled in with string.Template
+_TECHPRO_SYSTEM_PROMPT = """
+            You are a helpful customer service chatbot for TechPro Solutions, a premium technology retailer specializing in business and professional equipment.
+
+            **MULTILINGUAL SUPPORT:**
+            You can communicate in both English and Indonesian (Bahasa Indonesia). Always respond in the same language the customer uses.
+
+            **About TechPro Solutions:**
+            - Founded in 2018, we serve businesses, professionals, and tech enthusiasts across North America
+            - We specialize in business laptops, workstations, creative systems, and professional accessories
+            - We partner with top brands like Apple, Dell, HP, Lenovo, ASUS, and more
+            - Our mission is to provide cutting-edge technology solutions that empower productivity and innovation
+
+            **Current Promotions & Services:**
+            - 10% off business laptop bundles (laptop + monitor + accessories)
+            - Free setup and data migration with laptop purchases over $1,500
+            - Extended warranty at 50% off for first-time business customers
+            - Volume discounts: 5 units (5% off) up to 50+ units (15% off)
+            - 24/7 technical support and same-day delivery in major metropolitan areas
+
+            Always be professional, knowledgeable, and helpful.
+            """
+
+_TECHPRO_WELCOME_MESSAGE = "Welcome to TechPro Solutions! How can I help you find the perfect technology solution today?"
+
+_DEFAULT_SYSTEM_PROMPT_TMPL = string.Template("""
+            You are a helpful customer service chatbot for $name.
+            
+            **About $name:**
+            $description
+            
+            **Your Role:**
+            - Help customers with their inquiries
+            - Provide information about products and services
+            - Be professional, knowledgeable, and helpful
+            - Respond in the same language as the customer
+            
+            Always maintain a helpful and professional tone.
+            """)
+
+_DEFAULT_WELCOME_TMPL = string.Template("Welcome to $name! How can I assist you today?")
+
 class BrandService:
     def __init__(self):
         self.brands: Dict[str, Brand] = {}
+        # Brand configurations are loaded lazily from per-brand files on first use
         self.brand_configs: Dict[str, BrandConfig] = {}
+        # Brands without a config file, so lookups don't hit the disk again
+        self._missing_configs: set = set()
         self.chatbot_instances: Dict[str, ChatbotService] = {}
+        self._vector_stores: Dict[str, VectorStore] = {}
+        
+        # Storage layout: a small index of brand records plus one config file per brand.
+        # The legacy single-file format is migrated on first load.
+        self.index_file = "brands_index.json"
+        self.config_dir = "brands"
         self.config_file = "brands_config.json"
         
+        # Serialized form of each brand/config, refreshed only when that record changes
+        self._brand_dumps: Dict[str, dict] = {}
+        self._config_dumps: Dict[str, dict] = {}
+        
+        # Lowest numeric suffix per sanitized brand ID prefix that may still be free;
+        # every suffix below it is taken
+        self._id_suffix_counters: Dict[str, int] = {}
+        
+        # Debounced persistence state
+        self._index_dirty = False
+        self._dirty_configs: set = set()
+        self._deleted_configs: set = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        # Guards the dirty state and the cached dumps; held only briefly
+        self._save_lock = threading.Lock()
+        # Serializes flushes so an older snapshot is never written over a newer one
+        self._flush_lock = threading.Lock()
+        
         # Load existing brands from config file
         self._load_brands_from_file()
         
+        # Index of active brand IDs (dict keys keep insertion order)
+        self._active_brand_ids: Dict[str, None] = {
+            bid: None for bid, brand in self.brands.items() if brand.is_active
+        }
+        
         # Initialize default brand if no brands exist
         if not self.brands:
             self._create_default_brand()
     
     def _load_brands_from_file(self):
-        """Load brands and configurations from JSON file"""
+        """Load the brand index; configurations are loaded on demand"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Load brands
-                    for brand_data in data.get('brands', []):
-                        brand = Brand(**brand_data)
-                        self.brands[brand.id] = brand
-                    
-                    # Load brand configs
-                    for config_data in data.get('configs', []):
-                        config = BrandConfig(**config_data)
-                        self.brand_configs[config.brand_id] = config
-                        
-                    print(f"Loaded {len(self.brands)} brands from config file")
-        except Exception as e:
-            print(f"Error loading brands from file: {e}")
+            if os.path.exists(self.index_file):
+                data = self._read_json(self.index_file)
+                for brand_data in data.get('brands', []):
+                    brand = Brand(**brand_data)
+                    self.brands[brand.id] = brand
+                    self._cache_brand_dump(brand)
+                
+                logger.info("Loaded %s brands from index file", len(self.brands))
+            elif os.path.exists(self.config_file):
+                self._migrate_legacy_config_file()
+        except Exception:
+            logger.exception("Error loading brands from file")
     
-    def _save_brands_to_file(self):
-        """Save brands and configurations to JSON file"""
+    def _migrate_legacy_config_file(self):
+        """Load the legacy single-file config and schedule it to be written in the sharded layout"""
+        data = self._read_json(self.config_file)
+        
+        for brand_data in data.get('brands', []):
+            brand = Brand(**brand_data)
+            self.brands[brand.id] = brand
+            self._cache_brand_dump(brand)
+        
+        for config_data in data.get('configs', []):
+            config = BrandConfig(**config_data)
+            self.brand_configs[config.brand_id] = config
+            self._cache_config_dump(config)
+            self._dirty_configs.add(config.brand_id)
+        
+        self._index_dirty = True
+        self.flush()
+        logger.info("Migrated %s brands from %s", len(self.brands), self.config_file)
+    
+    def _config_path(self, brand_id: str) -> str:
+        # Brand IDs come from user input, so escape them before using them as file names
+        return os.path.join(self.config_dir, f"{quote(brand_id, safe='')}.json")
+    
+    def _load_brand_config(self, brand_id: str) -> Optional[BrandConfig]:
+        """Read a single brand configuration from its file.
+
+        Only a missing file is remembered; other read errors are logged and the
+        next lookup tries the file again.
+        """
         try:
-            data = {
-                'brands': [brand.model_dump() for brand in self.brands.values()],
-                'configs': [config.model_dump() for config in self.brand_configs.values()]
-            }
+            config = BrandConfig(**self._read_json(self._config_path(brand_id)))
+        except FileNotFoundError:
+            self._missing_configs.add(brand_id)
+            return None
+        except Exception:
+            logger.exception("Error loading config for brand %s", brand_id)
+            return None
+        self.brand_configs[brand_id] = config
+        self._cache_config_dump(config)
+        return config
+    
+    @staticmethod
+    def _read_json(path: str) -> dict:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    
+    @staticmethod
+    def _write_json_atomic(path: str, data: dict):
+        """Write JSON in a single call to a temp file, then swap it in so readers never see a partial file"""
+        if orjson:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2).encode('utf-8')
+        
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_file, path)
+    
+    def _save_brands_to_file(
+        self,
+        brand_dumps: Optional[List[dict]],
+        config_dumps: Dict[str, dict],
+        deleted_ids: set
+    ) -> Tuple[bool, set, set]:
+        """Write the brand index (unless None) and the given brand configurations.
+
+        Returns whether the index write failed and the config and deleted ids
+        whose writes failed, so they can be retried.
+        """
+        index_failed = False
+        failed_configs: set = set()
+        failed_deletes: set = set()
+        
+        if brand_dumps is not None:
+            try:
+                self._write_json_atomic(self.index_file, {'brands': brand_dumps})
+            except Exception:
+                logger.exception("Error saving brand index")
+                index_failed = True
+        
+        if config_dumps or deleted_ids:
+            try:
+                os.makedirs(self.config_dir, exist_ok=True)
+            except Exception:
+                logger.exception("Error creating brand config directory")
+                return index_failed, set(config_dumps), set(deleted_ids)
+        for brand_id, config_dump in config_dumps.items():
+            try:
+                self._write_json_atomic(self._config_path(brand_id), config_dump)
+            except Exception:
+                logger.exception("Error saving config for brand %s", brand_id)
+                failed_configs.add(brand_id)
+        for brand_id in deleted_ids:
+            try:
+                os.remove(self._config_path(brand_id))
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logger.exception("Error removing config for brand %s", brand_id)
+                failed_deletes.add(brand_id)
+        
+        return index_failed, failed_configs, failed_deletes
+    
+    def _cache_brand_dump(self, brand: Brand):
+        """Refresh the serialized form of a single brand"""
+        dump = brand.model_dump(mode="json")
+        with self._save_lock:
+            self._brand_dumps[brand.id] = dump
+    
+    def _cache_config_dump(self, config: BrandConfig):
+        """Refresh the serialized form of a single brand configuration"""
+        dump = config.model_dump(mode="json")
+        with self._save_lock:
+            self._config_dumps[config.brand_id] = dump
+    
+    def _release_id_suffix(self, brand_id: str):
+        """Let a deleted suffixed brand ID like 'acme-3' be handed out again"""
+        match = _ID_SUFFIX_PATTERN.match(brand_id)
+        if match:
+            prefix, suffix = match.group(1), int(match.group(2))
+            if suffix < self._id_suffix_counters.get(prefix, 1):
+                self._id_suffix_counters[prefix] = suffix
+    
+    def _mark_dirty(self, config_id: Optional[str] = None, index: bool = True):
+        """Schedule a debounced save of the brand index and/or one brand's configuration"""
+        with self._save_lock:
+            if index:
+                self._index_dirty = True
+            if config_id is not None:
+                self._dirty_configs.add(config_id)
+                self._deleted_configs.discard(config_id)
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        # Caller holds _save_lock
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending brand changes to disk immediately.
+
+        The pending state is snapshotted under the lock and written outside
+        it; anything that fails to write is marked dirty again and retried.
+        """
+        with self._flush_lock:
+            with self._save_lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not (self._index_dirty or self._dirty_configs or self._deleted_configs):
+                    return
+                brand_dumps = list(self._brand_dumps.values()) if self._index_dirty else None
+                config_dumps = {
+                    brand_id: self._config_dumps[brand_id]
+                    for brand_id in self._dirty_configs if brand_id in self._config_dumps
+                }
+                deleted_ids, self._deleted_configs = self._deleted_configs, set()
+                self._dirty_configs = set()
+                self._index_dirty = False
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str)
-                
-        except Exception as e:
-            print(f"Error saving brands to file: {e}")
+            index_failed, failed_configs, failed_deletes = self._save_brands_to_file(brand_dumps, config_dumps, deleted_ids)
+            
+            if index_failed or failed_configs or failed_deletes:
+                with self._save_lock:
+                    # Changes made since the snapshot take precedence over the failed ones
+                    self._index_dirty = self._index_dirty or index_failed
+                    self._dirty_configs |= failed_configs - self._deleted_configs
+                    self._deleted_configs |= failed_deletes - self._dirty_configs
+                    self._schedule_flush()
     
     def _create_default_brand(self):
         """Create default TechPro Solutions brand"""
+        now = datetime.now()
         default_brand = Brand(
             id="techpro",
             name="TechPro Solutions",
             description="Premium technology retailer specializing in business and professional equipment",
-            created_at=datetime.now(),
+            created_at=now,
             is_active=True
         )
         
         default_config = BrandConfig(
             brand_id="techpro",
-            system_prompt="""
-            You are a helpful customer service chatbot for TechPro Solutions, a premium technology retailer specializing in business and professional equipment.
-
-            **MULTILINGUAL SUPPORT:**
-            You can communicate in both English and Indonesian (Bahasa Indonesia). Always respond in the same language the customer uses.
-
-            **About TechPro Solutions:**
-            - Founded in 2018, we serve businesses, professionals, and tech enthusiasts across North America
-            - We specialize in business laptops, workstations, creative systems, and professional accessories
-            - We partner with top brands like Apple, Dell, HP, Lenovo, ASUS, and more
-            - Our mission is to provide cutting-edge technology solutions that empower productivity and innovation
-
-            **Current Promotions & Services:**
-            - 10% off business laptop bundles (laptop + monitor + accessories)
-            - Free setup and data migration with laptop purchases over $1,500
-            - Extended warranty at 50% off for first-time business customers
-            - Volume discounts: 5 units (5% off) up to 50+ units (15% off)
-            - 24/7 technical support and same-day delivery in major metropolitan areas
-
-            Always be professional, knowledgeable, and helpful.
-            """,
-            welcome_message="Welcome to TechPro Solutions! How can I help you find the perfect technology solution today?",
+            system_prompt=_TECHPRO_SYSTEM_PROMPT,
+            welcome_message=_TECHPRO_WELCOME_MESSAGE,
             company_info={
                 "name": "TechPro Solutions",
                 "founded": "2018",
@@ -102,14 +330,17 @@ class BrandService:
                 "secondary_color": "#6c757d",
                 "logo_url": "/static/techpro-logo.png"
             },
-            updated_at=datetime.now()
+            updated_at=now
         )
         
         self.brands["techpro"] = default_brand
         self.brand_configs["techpro"] = default_config
-        self._save_brands_to_file()
+        self._active_brand_ids["techpro"] = None
+        self._cache_brand_dump(default_brand)
+        self._cache_config_dump(default_config)
+        self._mark_dirty(config_id="techpro")
         
-        print("Created default TechPro Solutions brand")
+        logger.info("Created default TechPro Solutions brand")
     
     def create_brand(self, name: str, description: str, brand_id: Optional[str] = None) -> Brand:
         """Create a new brand"""
@@ -118,42 +349,30 @@ class BrandService:
         id_source = brand_id if brand_id else name
         sanitized_id = id_source.lower().replace(" ", "-")
 
-        # Ensure unique ID
+        # Ensure unique ID: the smallest free suffix, probing from the lowest one
+        # not known to be taken
         final_id = sanitized_id
-        counter = 1
-        while final_id in self.brands:
-            final_id = f"{sanitized_id}-{counter}"
-            counter += 1
-        
         if final_id in self.brands:
-            raise ValueError(f"Brand with ID '{final_id}' already exists")
+            counter = self._id_suffix_counters.get(sanitized_id, 1)
+            while f"{sanitized_id}-{counter}" in self.brands:
+                counter += 1
+            final_id = f"{sanitized_id}-{counter}"
+            self._id_suffix_counters[sanitized_id] = counter + 1
         
+        now = datetime.now()
         brand = Brand(
             id=final_id,
             name=name,
             description=description,
-            created_at=datetime.now(),
+            created_at=now,
             is_active=True
         )
         
         # Create default config for the brand
         default_config = BrandConfig(
             brand_id=final_id,
-            system_prompt=f"""
-            You are a helpful customer service chatbot for {name}.
-            
-            **About {name}:**
-            {description}
-            
-            **Your Role:**
-            - Help customers with their inquiries
-            - Provide information about products and services
-            - Be professional, knowledgeable, and helpful
-            - Respond in the same language as the customer
-            
-            Always maintain a helpful and professional tone.
-            """,
-            welcome_message=f"Welcome to {name}! How can I assist you today?",
+            system_prompt=_DEFAULT_SYSTEM_PROMPT_TMPL.substitute(name=name, description=description),
+            welcome_message=_DEFAULT_WELCOME_TMPL.substitute(name=name),
             company_info={
                 "name": name,
                 "description": description
@@ -162,27 +381,34 @@ class BrandService:
                 "primary_color": "#007bff",
                 "secondary_color": "#6c757d"
             },
-            updated_at=datetime.now()
+            updated_at=now
         )
         
         self.brands[final_id] = brand
         self.brand_configs[final_id] = default_config
-        self._save_brands_to_file()
+        self._active_brand_ids[final_id] = None
+        self._cache_brand_dump(brand)
+        self._cache_config_dump(default_config)
+        self._mark_dirty(config_id=final_id)
         
-        print(f"Created new brand: {name} (ID: {final_id})")
+        logger.info("Created new brand: %s (ID: %s)", name, final_id)
         return brand
     
     def get_brand(self, brand_id: str) -> Optional[Brand]:
         """Get a brand by ID"""
         return self.brands.get(brand_id)
     
+    def exists(self, brand_id: str) -> bool:
+        """Whether a brand (active or not) exists"""
+        return brand_id in self.brands
+    
     def get_all_brands(self) -> List[Brand]:
         """Get all brands"""
         return list(self.brands.values())
     
     def get_active_brands(self) -> List[Brand]:
         """Get all active brands"""
-        return [brand for brand in self.brands.values() if brand.is_active]
+        return [self.brands[brand_id] for brand_id in self._active_brand_ids]
     
     def update_brand(self, brand_id: str, name: Optional[str] = None, description: Optional[str] = None, is_active: Optional[bool] = None) -> Optional[Brand]:
         """Update a brand"""
@@ -197,9 +423,14 @@ class BrandService:
             brand.description = description
         if is_active is not None:
             brand.is_active = is_active
+            if is_active:
+                self._active_brand_ids[brand_id] = None
+            else:
+                self._active_brand_ids.pop(brand_id, None)
         
         brand.updated_at = datetime.now()
-        self._save_brands_to_file()
+        self._cache_brand_dump(brand)
+        self._mark_dirty()
         
         # Remove chatbot instance if brand is deactivated
         if is_active is False and brand_id in self.chatbot_instances:
@@ -214,28 +445,40 @@ class BrandService:
         
         try:
             # Delete vector store data
-            vector_store = VectorStore(brand_id=brand_id)
+            vector_store = self.get_vector_store(brand_id)
             vector_store.delete_brand_collection()
+            self._vector_stores.pop(brand_id, None)
             
             # Remove from memory
             del self.brands[brand_id]
+            self._release_id_suffix(brand_id)
+            self._active_brand_ids.pop(brand_id, None)
             if brand_id in self.brand_configs:
                 del self.brand_configs[brand_id]
+            self._missing_configs.discard(brand_id)
             if brand_id in self.chatbot_instances:
                 del self.chatbot_instances[brand_id]
             
-            self._save_brands_to_file()
+            with self._save_lock:
+                self._brand_dumps.pop(brand_id, None)
+                self._config_dumps.pop(brand_id, None)
+                self._dirty_configs.discard(brand_id)
+                self._deleted_configs.add(brand_id)
+            self._mark_dirty()
             
-            print(f"Deleted brand: {brand_id}")
+            logger.info("Deleted brand: %s", brand_id)
             return True
             
-        except Exception as e:
-            print(f"Error deleting brand {brand_id}: {e}")
+        except Exception:
+            logger.exception("Error deleting brand %s", brand_id)
             return False
     
     def get_brand_config(self, brand_id: str) -> Optional[BrandConfig]:
-        """Get brand configuration"""
-        return self.brand_configs.get(brand_id)
+        """Get brand configuration, loading it from disk on first access"""
+        config = self.brand_configs.get(brand_id)
+        if config is None and brand_id in self.brands and brand_id not in self._missing_configs:
+            config = self._load_brand_config(brand_id)
+        return config
     
     def update_brand_config(
         self, 
@@ -247,11 +490,10 @@ class BrandService:
         appearance_settings: Optional[Dict] = None
     ) -> Optional[BrandConfig]:
         """Update brand configuration"""
-        if brand_id not in self.brand_configs:
+        config = self.get_brand_config(brand_id)
+        if config is None:
             return None
         
-        config = self.brand_configs[brand_id]
-        
         if system_prompt is not None:
             config.system_prompt = system_prompt
         if persona_prompt is not None:
@@ -264,7 +506,8 @@ class BrandService:
             config.appearance_settings = appearance_settings
         
         config.updated_at = datetime.now()
-        self._save_brands_to_file()
+        self._cache_config_dump(config)
+        self._mark_dirty(config_id=brand_id, index=False)
         
         # Remove existing chatbot instance to force reload with new config
         if brand_id in self.chatbot_instances:
@@ -272,16 +515,38 @@ class BrandService:
         
         return config
     
+    def get_vector_store(self, brand_id: str) -> VectorStore:
+        """Get or create the shared vector store for a brand"""
+        vector_store = self._vector_stores.get(brand_id)
+        if vector_store is None:
+            vector_store = VectorStore(brand_id=brand_id)
+            self._vector_stores[brand_id] = vector_store
+        return vector_store
+    
+    def peek_vector_store(self, brand_id: str) -> Optional[VectorStore]:
+        """Return the brand's vector store if it is already open, without opening it"""
+        return self._vector_stores.get(brand_id)
+    
+    def warmup(self):
+        """Create chatbot instances for all active brands and warm their vector stores.
+
+        Called at startup so the first request to each brand doesn't pay for it.
+        """
+        for brand in self.get_active_brands():
+            if self.get_chatbot_instance(brand.id):
+                self.get_vector_store(brand.id).warmup()
+    
     def get_chatbot_instance(self, brand_id: str) -> Optional[ChatbotService]:
         """Get or create chatbot instance for a brand"""
         if brand_id not in self.brands or not self.brands[brand_id].is_active:
             return None
         
         if brand_id not in self.chatbot_instances:
-            brand_config = self.brand_configs.get(brand_id)
+            brand_config = self.get_brand_config(brand_id)
             self.chatbot_instances[brand_id] = ChatbotService(
                 brand_id=brand_id,
-                brand_config=brand_config
+                brand_config=brand_config,
+                vector_store=self.get_vector_store(brand_id)
             )
         
         return self.chatbot_instances[brand_id]
@@ -297,17 +562,18 @@ class BrandService:
                 del self.chatbot_instances[brand_id]
             
             # Create new instance with updated config
-            brand_config = self.brand_configs.get(brand_id)
+            brand_config = self.get_brand_config(brand_id)
             self.chatbot_instances[brand_id] = ChatbotService(
                 brand_id=brand_id,
-                brand_config=brand_config
+                brand_config=brand_config,
+                vector_store=self.get_vector_store(brand_id)
             )
             
-            print(f"Refreshed chatbot instance for brand: {brand_id}")
+            logger.info("Refreshed chatbot instance for brand: %s", brand_id)
             return True
             
-        except Exception as e:
-            print(f"Error refreshing chatbot instance for {brand_id}: {e}")
+        except Exception:
+            logger.exception("Error refreshing chatbot instance for %s", brand_id)
             return False
     
     def get_brand_stats(self, brand_id: str) -> Optional[Dict]:
@@ -316,25 +582,23 @@ class BrandService:
             return None
         
         try:
-            vector_store = VectorStore(brand_id=brand_id)
-            products = vector_store.get_all_products()
+            # Counts are maintained on product writes instead of read from the catalog per call
+            counts = self.get_vector_store(brand_id).get_catalog_counts()
+            categories = sorted(counts.categories)
             
             chatbot = self.get_chatbot_instance(brand_id)
             active_conversations = chatbot.get_active_conversations_count() if chatbot else 0
             
-            categories = list(set(product.category for product in products))
-            available_products = [p for p in products if p.availability]
-            
             return {
                 "brand_id": brand_id,
                 "brand_name": self.brands[brand_id].name,
-                "total_products": len(products),
-                "available_products": len(available_products),
+                "total_products": counts.total,
+                "available_products": counts.available,
                 "categories": len(categories),
                 "active_conversations": active_conversations,
-                "category_list": sorted(categories)
+                "category_list": categories
             }
             
-        except Exception as e:
-            print(f"Error getting brand stats for {brand_id}: {e}")
+        except Exception:
+            logger.exception("Error getting brand stats for %s", brand_id)
             return None
\ No newline at end of file
@@ -1,22 +1,238 @@
-from openai import OpenAI
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 import json
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from config import settings
 from models import (
     ChatMessage, ChatRequest, ChatResponse, Product, ProductRecommendation,
     WebSocketChatRequest, WebSocketChatChunk, Brand, BrandConfig
 )
-from vector_store import VectorStore
+from vector_store import SEARCH_RESULT_TTL_SECONDS, VectorStore
+from cache_utils import LRUCache
+from response_cache import SemanticResponseCache
+from openai_batcher import OpenAIBatcher
+from embedding_batcher import embed_batched
+from conversation_store import ConversationStore
+from openai_client import get_async_openai_client, get_openai_semaphore
+from embedding_cache import aembed_query_cached
 import asyncio
+import functools
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+from dataclasses import dataclass, field
+import numpy as np
+
+try:
+    from lingua import Language, LanguageDetectorBuilder
+except ImportError:
+    Language = None
+    LanguageDetectorBuilder = None
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent user/assistant messages sent to OpenAI per turn
+MAX_HISTORY_MESSAGES = 12
+
+# Once the unsummarized history exceeds either limit, older turns are folded into a summary
+SUMMARY_TRIGGER_TOKENS = 2000
+SUMMARY_KEEP_MESSAGES = 6
+
+# Conversations kept in memory per chatbot; least recently used ones are evicted
+MAX_CONVERSATIONS = 1000
+
+# Recommendations scoring below this skip the LLM reasoning call
+MIN_REASONING_MATCH_SCORE = 0.25
+REASONING_CACHE_SIZE = 1024
+# Keyed by catalog version and product content; the TTL bounds how long reasoning
+# for products changed through other workers can be served.
+REASONING_CACHE_TTL_SECONDS = SEARCH_RESULT_TTL_SECONDS
+
+# Cached LLM intent decisions; very short or PII-like messages are not cached
+INTENT_CACHE_SIZE = 10000
+MIN_INTENT_CACHE_LENGTH = 8
+_PII_RE = re.compile(r"@|\d{6,}")
+
+
+def _is_cacheable_message(message: str) -> bool:
+    """Whether results for a message may be cached and shared across users"""
+    return len(message) >= MIN_INTENT_CACHE_LENGTH and not _PII_RE.search(message)
+
+# Cached LLM relevance checks, keyed by message and suggested product ids (same caching rules).
+# They expire with the search results they were made for, since catalog_version only
+# tracks this process's writes and products may be changed through other workers.
+RELEVANCE_CACHE_SIZE = 10000
+RELEVANCE_CACHE_TTL_SECONDS = SEARCH_RESULT_TTL_SECONDS
+
+# Leading text of a response up to (not including) its first sentence terminator
+_FIRST_SENTENCE_RE = re.compile(r"[^.!?]*")
+
+# Keywords that on their own mark a message as a product request (English and Indonesian).
+# Matched as whole words, so inflected forms are listed explicitly.
+_STRONG_PRODUCT_KEYWORDS = frozenset({
+    'laptop', 'laptops', 'computer', 'computers', 'macbook', 'macbooks', 'iphone', 'iphones',
+    'monitor', 'monitors', 'mouse', 'keyboard', 'keyboards',
+    'recommend', 'recommends', 'recommended', 'recommendation', 'recommendations',
+    'suggest', 'suggestion', 'suggestions', 'looking for',
+    'buy', 'buying', 'purchase', 'purchasing',
+    'price', 'prices', 'pricing', 'cost', 'costs', 'budget',
+    'specs', 'spec', 'specification', 'specifications', 'feature', 'features',
+    'compare', 'comparing', 'comparison', 'versus', 'show me',
+    'komputer', 'handphone', 'hp', 'rekomendasi', 'rekomendasikan', 'sarankan',
+    'cari', 'mencari', 'beli', 'membeli',
+    'harga', 'biaya', 'spesifikasi', 'spek', 'fitur',
+    'banding', 'bandingkan', 'membandingkan', 'perbedaan', 'tunjukkan'
+})
+
+# Keywords that only hint at a product request; these go to the LLM classifier
+_WEAK_PRODUCT_KEYWORDS = frozenset({
+    'need', 'needs', 'want', 'wants', 'which', 'what', 'difference', 'vs',
+    'butuh', 'perlu', 'mau', 'ingin', 'mana yang', 'apa'
+})
+
+
+def _compile_keyword_pattern(keywords: frozenset) -> "re.Pattern":
+    # Sorted for a stable pattern; whole words only, so "cost" doesn't match "costume"
+    alternatives = "|".join(re.escape(k) for k in sorted(keywords, key=lambda k: (-len(k), k)))
+    return re.compile(r"\b(?:" + alternatives + r")\b", re.IGNORECASE)
+
+
+_STRONG_INTENT_RE = _compile_keyword_pattern(_STRONG_PRODUCT_KEYWORDS)
+_WEAK_INTENT_RE = _compile_keyword_pattern(_WEAK_PRODUCT_KEYWORDS)
+
+RESPONSE_ERROR_MESSAGE = "I apologize, but I'm having trouble generating a response right now. Please try rephrasing your question. / Maaf, saya mengalami kesulitan memberikan respons saat ini. Silakan coba ulangi pertanyaan Anda."
+VOICE_RESPONSE_ERROR_MESSAGE = "Sorry, I'm having trouble right now. / Maaf, saya mengalami masalah."
+
+NO_PRODUCTS_CONTEXT = "No specific products found for this query."
+
+# Static instructions, appended to the system prompt so every turn starts with the same prefix
+PRODUCT_CONTEXT_INSTRUCTION = """
+**Using Product Information:**
+When a "Product Information" message is provided for the current query, use it to help answer the customer's question. Remember to:
+- Respond in the same language as the customer (English or Indonesian)
+- Reference their conversation history when relevant
+- Suggest products that match their stated needs and preferences
+- Mention current promotions when appropriate
+- Ask follow-up questions to better understand their requirements (except in voice responses)
+"""
+
+VOICE_INSTRUCTION = """
+IMPORTANT: This is a voice conversation. Every response must be:
+- Maximum 1 sentence
+- Concise and direct
+- Natural for voice output
+- Still helpful and informative
+
+Respond in the same language as the customer (English or Indonesian).
+"""
+
+NO_PRODUCTS_INSTRUCTION = """
+The customer is asking for product recommendations, but no matching products were found in the database.
+Please acknowledge their request and suggest they:
+1. Try different search terms
+2. Contact our support team for personalized assistance
+3. Browse our website categories
+
+Respond in the same language as the customer.
+"""
+
+# First-turn responses are reused for prompts at least this similar
+RESPONSE_CACHE_THRESHOLD = 0.92
+RESPONSE_CACHE_TTL_SECONDS = 3600
+
+REASONING_FALLBACK = "These products were selected based on their relevance to your query and our expertise in matching technology solutions to professional needs. / Produk-produk ini dipilih berdasarkan relevansinya dengan pertanyaan Anda dan keahlian kami dalam mencocokkan solusi teknologi dengan kebutuhan profesional."
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_product_block(
+    product_id: str,
+    name: str,
+    category: str,
+    price: float,
+    description: str,
+    top_features: tuple,
+    has_more_features: bool,
+    availability: bool
+) -> str:
+    """Format the query-independent part of a product's context entry.
+
+    Arguments are primitives so the result can be memoized; any change to a
+    product's fields produces a new cache key.
+    """
+    return (
+        f"**{name}** (Category: {category})\n"
+        f"   Price: ${price:,.2f}\n"
+        f"   Description: {description}\n"
+        f"   Key Features: {', '.join(top_features)}{'...' if has_more_features else ''}\n"
+        f"   Available: {'Yes' if availability else 'No'}\n"
+    )
+
+
+# Native language detector when lingua is installed; keyword heuristic otherwise
+_LANGUAGE_DETECTOR = (
+    LanguageDetectorBuilder.from_languages(Language.ENGLISH, Language.INDONESIAN).build()
+    if LanguageDetectorBuilder else None
+)
+_INDONESIAN_KEYWORDS = frozenset({'saya', 'butuh', 'perlu', 'cari', 'mau', 'ingin', 'untuk', 'yang', 'apa', 'bagaimana'})
+_WORD_RE = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_indonesian(text: str) -> bool:
+    """Detect whether a query is written in Indonesian"""
+    if _LANGUAGE_DETECTOR is not None:
+        return _LANGUAGE_DETECTOR.detect_language_of(text) == Language.INDONESIAN
+    return not _INDONESIAN_KEYWORDS.isdisjoint(_WORD_RE.findall(text.lower()))
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/Indonesian text)"""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class ConversationState:
+    """Messages of one conversation plus a rolling summary of its older turns"""
+    messages: List[ChatMessage] = field(default_factory=list)
+    summary: str = ""
+    # Number of leading messages already folded into the summary
+    summarized_count: int = 0
+    summarizing: bool = False
+
+    def unsummarized_messages(self) -> List[ChatMessage]:
+        return self.messages[self.summarized_count:]
+
 
 class ChatbotService:
-    def __init__(self, brand_id: str = "default", brand_config: Optional[BrandConfig] = None):
+    def __init__(
+        self,
+        brand_id: str = "default",
+        brand_config: Optional[BrandConfig] = None,
+        vector_store: Optional[VectorStore] = None
+    ):
         self.brand_id = brand_id
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.vector_store = VectorStore(brand_id=brand_id)
-        self.conversations: Dict[str, List[ChatMessage]] = {}
+        self.openai_client = get_async_openai_client()
+        self.vector_store = vector_store or VectorStore(brand_id=brand_id)
+        self.conversations: "OrderedDict[str, ConversationState]" = OrderedDict()
+        self._background_tasks: set = set()
+        # Turns of one conversation run one at a time; locks go away with their last user
+        self._conversation_locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+        self._inflight_turns: Dict[Tuple[str, str, bool], asyncio.Future] = {}
+        # Optional shared store so conversations survive restarts and can move between workers
+        self._conversation_store = ConversationStore(brand_id)
+        self._reasoning_cache = LRUCache(maxsize=REASONING_CACHE_SIZE)
+        self._intent_cache = LRUCache(maxsize=INTENT_CACHE_SIZE)
+        self._relevance_cache = LRUCache(maxsize=RELEVANCE_CACHE_SIZE)
+        # Classifier calls from concurrent turns are coalesced; response generation is not,
+        # since each one carries its own conversation history
+        self._intent_batcher = OpenAIBatcher(self._create_completion)
+        self._response_cache = SemanticResponseCache(
+            threshold=RESPONSE_CACHE_THRESHOLD,
+            ttl=RESPONSE_CACHE_TTL_SECONDS
+        )
         
         # Use custom brand config or default
         if brand_config:
@@ -26,6 +242,12 @@ class ChatbotService:
             # Default system prompt for TechPro Solutions
             self.system_prompt = self._get_default_system_prompt()
             self.brand_config = None
+        
+        # Identical leading messages on every turn, so the provider can serve them from its prompt cache
+        static_prompt = f"{self.system_prompt}\n{PRODUCT_CONTEXT_INSTRUCTION}"
+        self._static_prefix_messages = [{"role": "system", "content": static_prompt}]
+        self._voice_prefix_messages = [{"role": "system", "content": f"{static_prompt}\n{VOICE_INSTRUCTION}"}]
+        self._product_context_header = f"Here are some relevant products from our {self.brand_id} catalog:\n\n"
     
     def _build_system_prompt(self, brand_config: BrandConfig) -> str:
         """Build combined system prompt with persona prompt if available"""
@@ -85,92 +307,230 @@ class ChatbotService:
         Keep responses informative but conversational.
         """
 
+    def _get_or_create_conversation(self, conversation_id: str) -> ConversationState:
+        """Get a conversation, creating it if needed, and mark it as most recently used"""
+        state = self.conversations.get(conversation_id)
+        if state is None:
+            # Only user/assistant turns are stored; the shared system prompt is
+            # prepended when the OpenAI payload is built
+            state = ConversationState()
+            self.conversations[conversation_id] = state
+            while len(self.conversations) > MAX_CONVERSATIONS:
+                self.conversations.popitem(last=False)
+        else:
+            self.conversations.move_to_end(conversation_id)
+        return state
+
+    async def _get_or_load_conversation(self, conversation_id: str) -> ConversationState:
+        """Like _get_or_create_conversation, but restores unknown conversations from the shared store"""
+        if conversation_id not in self.conversations and self._conversation_store.enabled:
+            messages = await self._conversation_store.load(conversation_id)
+            # Another turn may have created the conversation while we were loading
+            if messages and conversation_id not in self.conversations:
+                state = self._get_or_create_conversation(conversation_id)
+                state.messages.extend(messages)
+                return state
+        return self._get_or_create_conversation(conversation_id)
+
+    def _spawn_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _maybe_summarize(self, state: ConversationState):
+        """Start a background summary of older turns once the live history grows too long"""
+        if state.summarizing:
+            return
+        pending = state.unsummarized_messages()
+        if len(pending) <= SUMMARY_KEEP_MESSAGES:
+            return
+        if len(pending) <= MAX_HISTORY_MESSAGES and sum(_estimate_tokens(m.content) for m in pending) <= SUMMARY_TRIGGER_TOKENS:
+            return
+        
+        state.summarizing = True
+        self._spawn_background(self._summarize_older(state))
+
+    async def _summarize_older(self, state: ConversationState):
+        """Fold all but the most recent messages into the conversation summary"""
+        try:
+            end = len(state.messages) - SUMMARY_KEEP_MESSAGES
+            older = state.messages[state.summarized_count:end]
+            if not older:
+                return
+            
+            transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in older)
+            prompt = f"""
+            Update the summary of a customer service conversation with the new messages below.
+            Keep the customer's stated needs, budget, preferences, products discussed and any open questions.
+            Write at most 150 words, in the language the customer uses.
+            
+            Current summary:
+            {state.summary or "(none)"}
+            
+            New messages:
+            {transcript}
+            
+            Updated summary:
+            """
+            
+            response = await self._create_completion(
+                model=settings.OPENAI_SUMMARY_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.3
+            )
+            
+            state.summary = response.choices[0].message.content.strip()
+            state.summarized_count = end
+        except Exception:
+            logger.exception("Error summarizing conversation")
+        finally:
+            state.summarizing = False
+
     async def _is_asking_for_product_recommendations(self, message: str, conversation_history: List[ChatMessage]) -> bool:
         """
-        Use OpenAI to determine if the user is asking for product recommendations
+        Determine if the user is asking for product recommendations
         Supports both English and Indonesian
+        
+        Clear-cut messages are decided by keyword match; only messages with
+        ambiguous keywords ("what", "butuh", ...) are sent to the LLM.
         """
+        if _STRONG_INTENT_RE.search(message):
+            return True
+        if not _WEAK_INTENT_RE.search(message):
+            return False
+        
+        cache_key = None
+        if _is_cacheable_message(message):
+            # The history includes the current message, so the role before it is second to last
+            previous_role = conversation_history[-2].role if len(conversation_history) > 1 else None
+            cache_key = (hashlib.blake2b(message.encode("utf-8"), digest_size=16).digest(), previous_role)
+            cached = self._intent_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Build context from recent conversation
-            recent_context = ""
-            if len(conversation_history) > 1:
-                recent_messages = conversation_history[-4:]  # Last 4 messages for context
-                context_parts = []
-                for msg in recent_messages:
-                    if msg.role != "system":
-                        context_parts.append(f"{msg.role}: {msg.content}")
-                recent_context = "\n".join(context_parts)
+            result = await self._classify_intent_with_llm(message, conversation_history)
+            if cache_key is not None:
+                self._intent_cache.set(cache_key, result)
+            return result
+        except Exception:
+            logger.exception("Error determining recommendation intent")
+            # Fallback: treat ambiguous product keywords as a product request
+            return True
 
-            prompt = f"""
-            Analyze the following customer message and conversation context to determine if the customer is asking for product recommendations, product information, product comparisons, or wants to know about specific products.
-
-            Current message: "{message}"
-
-            Recent conversation context:
-            {recent_context}
-
-            Instructions:
-            - Return ONLY "true" or "false"
-            - Return "true" if the customer is:
-              * Asking for product recommendations (in any language)
-              * Looking for specific products
-              * Asking about product features, specifications, or comparisons
-              * Asking "what do you have", "show me products", "I need...", "I'm looking for..."
-              * Using Indonesian phrases like "saya butuh", "rekomendasikan", "produk apa", "laptop apa", etc.
-              * Asking about prices, availability, or technical specs of products
-            - Return "false" if the customer is:
-              * Asking about company information
-              * Asking about promotions/services in general
-              * Asking for support/help
-              * Just greeting or having general conversation
-              * Asking about policies, warranty, shipping, etc. without mentioning specific products
-
-            Examples of TRUE:
-            - "I need a laptop for business"
-            - "What laptops do you recommend?"
-            - "Saya butuh laptop untuk kerja"
-            - "Show me your MacBooks"
-            - "Compare Dell vs HP laptops"
-            - "What's the price of iPhone 15?"
-
-            Examples of FALSE:
-            - "Tell me about your company"
-            - "What promotions do you have?"
-            - "Hello, how are you?"
-            - "Ceritakan tentang perusahaan kalian"
-            - "What's your warranty policy?"
-
-            Response (true/false):
-            """
+    async def _classify_intent_with_llm(self, message: str, conversation_history: List[ChatMessage]) -> bool:
+        """Use OpenAI to classify messages the keyword fast path can't decide"""
+        # Build context from recent conversation
+        recent_context = ""
+        if conversation_history:
+            recent_messages = conversation_history[-4:]  # Last 4 messages for context
+            recent_context = "\n".join(f"{msg.role}: {msg.content}" for msg in recent_messages)
+        
+        prompt = f"""
+        Analyze the following customer message and conversation context to determine if the customer is asking for product recommendations, product information, product comparisons, or wants to know about specific products.
+        
+        Current message: "{message}"
+        
+        Recent conversation context:
+        {recent_context}
+        
+        Instructions:
+        - Return ONLY "true" or "false"
+        - Return "true" if the customer is:
+          * Asking for product recommendations (in any language)
+          * Looking for specific products
+          * Asking about product features, specifications, or comparisons
+          * Asking "what do you have", "show me products", "I need...", "I'm looking for..."
+          * Using Indonesian phrases like "saya butuh", "rekomendasikan", "produk apa", "laptop apa", etc.
+          * Asking about prices, availability, or technical specs of products
+        - Return "false" if the customer is:
+          * Asking about company information
+          * Asking about promotions/services in general
+          * Asking for support/help
+          * Just greeting or having general conversation
+          * Asking about policies, warranty, shipping, etc. without mentioning specific products
+        
+        Examples of TRUE:
+        - "I need a laptop for business"
+        - "What laptops do you recommend?"
+        - "Saya butuh laptop untuk kerja"
+        - "Show me your MacBooks"
+        - "Compare Dell vs HP laptops"
+        - "What's the price of iPhone 15?"
+        
+        Examples of FALSE:
+        - "Tell me about your company"
+        - "What promotions do you have?"
+        - "Hello, how are you?"
+        - "Ceritakan tentang perusahaan kalian"
+        - "What's your warranty policy?"
+        
+        Response (true/false):
+        """
+        
+        # "true"/"false" are single tokens, so one output token is enough
+        response = await self._intent_batcher.submit(
+            model=settings.OPENAI_CLASSIFIER_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=1,
+            temperature=0.1
+        )
+        
+        result = response.choices[0].message.content.strip().lower()
+        return result.startswith("true")
 
-            response = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
-                temperature=0.1
-            )
-            
-            result = response.choices[0].message.content.strip().lower()
-            return result == "true"
-            
-        except Exception as e:
-            print(f"Error determining recommendation intent: {e}")
-            # Fallback: simple keyword detection for both languages
-            product_keywords = [
-                # English keywords
-                'laptop', 'computer', 'macbook', 'iphone', 'monitor', 'mouse', 'keyboard',
-                'recommend', 'suggest', 'need', 'looking for', 'want', 'buy', 'purchase',
-                'price', 'cost', 'budget', 'specs', 'specifications', 'features',
-                'compare', 'difference', 'vs', 'versus', 'which', 'what', 'show me',
-                # Indonesian keywords
-                'laptop', 'komputer', 'handphone', 'hp', 'monitor', 'mouse', 'keyboard',
-                'rekomendasikan', 'sarankan', 'butuh', 'perlu', 'cari', 'mau', 'ingin', 'beli',
-                'harga', 'biaya', 'budget', 'spesifikasi', 'spek', 'fitur',
-                'bandingkan', 'banding', 'perbedaan', 'mana yang', 'apa', 'tunjukkan'
-            ]
-            
-            message_lower = message.lower()
-            return any(keyword in message_lower for keyword in product_keywords)
+    async def _create_completion(self, **kwargs):
+        """Create a chat completion, bounded by the shared concurrency limit"""
+        async with get_openai_semaphore():
+            return await self.openai_client.chat.completions.create(**kwargs)
+
+    async def _classify_with_speculative_search(
+        self,
+        message: str,
+        conversation: List[ChatMessage],
+        limit: int = 5,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Run intent classification and a product search concurrently.
+
+        The search results are discarded when the message turns out not to be
+        a product request.
+        """
+        is_asking_for_products, relevant_products = await asyncio.gather(
+            self._is_asking_for_product_recommendations(message, conversation),
+            self._search_products(message, limit, query_embedding)
+        )
+        if not is_asking_for_products:
+            return False, []
+        return True, relevant_products
+
+    async def _embed(self, text: str) -> List[float]:
+        """Embed text, batched with other concurrent embedding requests"""
+        return await embed_batched(text)
+
+    async def _embed_query(self, text: str) -> Optional[List[float]]:
+        """Embed a user message, returning None if the embedding call fails"""
+        try:
+            return await aembed_query_cached(text, self._embed)
+        except Exception:
+            logger.exception("Error embedding message")
+            return None
+
+    async def _search_products(
+        self,
+        query: str,
+        limit: int,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the vector store, which caches repeated queries for a short TTL"""
+        # Embed on the event loop and only hand the Chroma query to a worker thread
+        if query_embedding is None:
+            query_embedding = await self._embed_query(query)
+            if query_embedding is None:
+                return []
+        
+        return await asyncio.to_thread(self.vector_store.search_products, query, limit, query_embedding)
 
     def _extract_category_from_query(self, query: str, available_categories: list) -> Optional[str]:
         """Simple keyword match for category extraction from user query."""
@@ -184,6 +544,18 @@ class ChatbotService:
         """Use OpenAI to check if suggested products are relevant to the user's query."""
         if not products:
             return False
+        cache_key = None
+        if _is_cacheable_message(query):
+            # Product ids are only unique within a catalog version
+            content = "\0".join([query, *(p.id for p in products)])
+            cache_key = (
+                self.vector_store.catalog_version,
+                hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+            )
+            cached = self._relevance_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < RELEVANCE_CACHE_TTL_SECONDS:
+                return cached[1]
+        
         product_names = ', '.join([f"{p.name} ({p.category})" for p in products])
         prompt = (
             f'User asked: "{query}"\n'
@@ -191,43 +563,97 @@ class ChatbotService:
             'Are these products relevant to the user\'s request? Return only "true" or "false".'
         )
         try:
-            response = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            response = await self._create_completion(
+                model=settings.OPENAI_CLASSIFIER_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
+                max_tokens=1,
                 temperature=0.0
             )
-            result = response.choices[0].message.content.strip().lower()
-            return result == "true"
-        except Exception as e:
-            print(f"Error in LLM relevance check: {e}")
+            is_relevant = response.choices[0].message.content.strip().lower().startswith("true")
+            if cache_key is not None:
+                self._relevance_cache.set(cache_key, (time.monotonic(), is_relevant))
+            return is_relevant
+        except Exception:
+            logger.exception("Error in LLM relevance check")
             return True  # fallback: assume relevant if LLM fails
 
-    async def chat(self, request: ChatRequest) -> ChatResponse:
-        """Main chat function that handles customer queries with conversation history"""
+    def _conversation_lock(self, conversation_id: str) -> asyncio.Lock:
+        lock = self._conversation_locks.get(conversation_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._conversation_locks[conversation_id] = lock
+        return lock
+
+    async def chat(self, request: ChatRequest, use_cache: bool = True) -> ChatResponse:
+        """Main chat function that handles customer queries with conversation history.
+
+        With use_cache=False the semantic response cache is neither read nor written.
+        """
+        conversation_id = request.conversation_id
+        if not conversation_id:
+            return await self._chat_turn(request, use_cache)
+        
+        # A duplicate of a turn that is still being answered (retry, double click)
+        # shares the first request's response instead of calling the LLM again.
+        # If that request is cancelled (client disconnected) or fails, its future is
+        # cancelled and the waiters answer the turn themselves, one of them taking over.
+        inflight_key = (conversation_id, request.message, bool(request.voice))
+        while True:
+            inflight = self._inflight_turns.get(inflight_key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    # This request itself was cancelled
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_turns[inflight_key] = future
         try:
+            async with self._conversation_lock(conversation_id):
+                response = await self._chat_turn(request, use_cache)
+            future.set_result(response)
+            return response
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight_turns.pop(inflight_key, None)
+
+    async def _chat_turn(self, request: ChatRequest, use_cache: bool = True) -> ChatResponse:
+        """Handle one chat turn; callers serialize turns of the same conversation"""
+        try:
+            # One timestamp per turn, shared by the user and assistant messages
+            now = datetime.now(timezone.utc)
+            
             # Get or create conversation
             conversation_id = request.conversation_id or str(uuid.uuid4())
-            if conversation_id not in self.conversations:
-                self.conversations[conversation_id] = [
-                    ChatMessage(role="system", content=self.system_prompt, timestamp=datetime.now())
-                ]
+            state = await self._get_or_load_conversation(conversation_id)
+            conversation = state.messages
             
             # Add user message to conversation
             user_message = ChatMessage(
                 role="user", 
                 content=request.message, 
-                timestamp=datetime.now()
+                timestamp=now
             )
-            self.conversations[conversation_id].append(user_message)
+            conversation.append(user_message)
             
-            # Check if user is asking for product recommendations
-            is_asking_for_products = await self._is_asking_for_product_recommendations(
-                request.message, 
-                self.conversations[conversation_id]
+            # Opening messages don't depend on history, so they can be answered from the
+            # semantic response cache; the embedding is reused for the product search
+            query_embedding = None
+            if len(conversation) == 1:
+                query_embedding = await self._embed_query(request.message)
+            
+            # Classify intent while speculatively searching the catalog
+            is_asking_for_products, relevant_products = await self._classify_with_speculative_search(
+                request.message,
+                conversation,
+                query_embedding=query_embedding
             )
             
-            relevant_products = []
             product_context = ""
             suggested_products = None
             confidence_score = None
@@ -236,16 +662,14 @@ class ChatbotService:
             
             # Only search for products if the user is asking for them
             if is_asking_for_products:
-                relevant_products = self.vector_store.search_products(request.message, limit=5)
                 relevant_products = [item for item in relevant_products if item['similarity_score'] >= similarity_threshold]
                 if not relevant_products:
                     fallback_message = "Sorry, we don't have products matching your request. Please try a different search term or browse our categories."
                     suggested_products = []
                     confidence_score = 0.0
                 else:
-                    product_context = self._prepare_product_context(relevant_products)
+                    product_context, confidence_score = self._prepare_product_context(relevant_products)
                     suggested_products = [item["product"] for item in relevant_products[:3]]
-                    confidence_score = self._calculate_confidence(relevant_products)
                     # LLM-based post-filtering for relevance
                     is_relevant = await self._are_suggestions_relevant_with_ai(request.message, suggested_products)
                     if not is_relevant:
@@ -253,22 +677,36 @@ class ChatbotService:
                         suggested_products = []
                         confidence_score = 0.0
             
-            # Generate response using OpenAI with full conversation context
-            response_content = fallback_message if fallback_message else await self._generate_response(
-                conversation_id, 
-                product_context,
-                request.message,
-                is_asking_for_products,
-                is_voice=request.voice  # Pass voice parameter
-            )
+            # Voice/text and product/general answers are cached separately, and
+            # product answers only until the catalog changes. The cache is shared by
+            # every user of the brand, so PII-like openers are never read or stored.
+            cache_bucket = (request.voice, is_asking_for_products, self.vector_store.catalog_version)
+            use_cache = use_cache and _is_cacheable_message(request.message)
+            response_content = fallback_message
+            if response_content is None and query_embedding is not None and use_cache:
+                response_content = self._response_cache.lookup(query_embedding, cache_bucket)
+            
+            if response_content is None:
+                # Generate response using OpenAI with full conversation context
+                response_content = await self._generate_response(
+                    conversation_id, 
+                    product_context,
+                    request.message,
+                    is_asking_for_products,
+                    is_voice=request.voice  # Pass voice parameter
+                )
+                if query_embedding is not None and use_cache and response_content not in (RESPONSE_ERROR_MESSAGE, VOICE_RESPONSE_ERROR_MESSAGE):
+                    self._response_cache.store(query_embedding, cache_bucket, response_content)
             
             # Add assistant response to conversation
             assistant_message = ChatMessage(
                 role="assistant", 
                 content=response_content, 
-                timestamp=datetime.now()
+                timestamp=now
             )
-            self.conversations[conversation_id].append(assistant_message)
+            conversation.append(assistant_message)
+            self._maybe_summarize(state)
+            await self._conversation_store.append(conversation_id, [user_message, assistant_message])
             
             return ChatResponse(
                 response=response_content,
@@ -277,8 +715,8 @@ class ChatbotService:
                 confidence_score=confidence_score
             )
             
-        except Exception as e:
-            print(f"Error in chat service: {e}")
+        except Exception:
+            logger.exception("Error in chat service")
             return ChatResponse(
                 response="I'm sorry, I'm having trouble processing your request right now. Please try again. / Maaf, saya mengalami kesulitan memproses permintaan Anda. Silakan coba lagi.",
                 conversation_id=conversation_id or str(uuid.uuid4())
@@ -286,30 +724,42 @@ class ChatbotService:
 
     async def chat_stream(self, request: WebSocketChatRequest) -> AsyncGenerator[WebSocketChatChunk, None]:
         """Stream chat responses for WebSocket"""
+        if not request.conversation_id:
+            async for chunk in self._chat_stream_turn(request):
+                yield chunk
+            return
+        
+        async with self._conversation_lock(request.conversation_id):
+            async for chunk in self._chat_stream_turn(request):
+                yield chunk
+
+    async def _chat_stream_turn(self, request: WebSocketChatRequest) -> AsyncGenerator[WebSocketChatChunk, None]:
+        """Stream one chat turn; callers serialize turns of the same conversation"""
         try:
+            # One timestamp per turn, shared by the user and assistant messages
+            now = datetime.now(timezone.utc)
+            
             # Get or create conversation
             conversation_id = request.conversation_id or str(uuid.uuid4())
-            if conversation_id not in self.conversations:
-                self.conversations[conversation_id] = [
-                    ChatMessage(role="system", content=self.system_prompt, timestamp=datetime.now())
-                ]
+            state = await self._get_or_load_conversation(conversation_id)
+            conversation = state.messages
             
             # Add user message to conversation
             user_message = ChatMessage(
                 role="user", 
                 content=request.message, 
-                timestamp=datetime.now()
+                timestamp=now
             )
-            print(f"[WebSocket][{conversation_id}] User: {request.message}")
-            self.conversations[conversation_id].append(user_message)
+            logger.debug("[WebSocket][%s] User: %s", conversation_id, request.message)
+            conversation.append(user_message)
             
-            # Check if user is asking for product recommendations
-            is_asking_for_products = await self._is_asking_for_product_recommendations(
-                request.message, 
-                self.conversations[conversation_id]
+            # Classify intent while speculatively searching the catalog
+            is_asking_for_products, relevant_products = await self._classify_with_speculative_search(
+                request.message,
+                conversation
             )
             
-            relevant_products = []
+            product_context = ""
             suggested_products = None
             confidence_score = None
             fallback_message = None
@@ -317,20 +767,19 @@ class ChatbotService:
             
             # Only search for products if the user is asking for them
             if is_asking_for_products:
-                relevant_products = self.vector_store.search_products(request.message, limit=5)
                 relevant_products = [item for item in relevant_products if item['similarity_score'] >= similarity_threshold]
                 if not relevant_products:
                     fallback_message = "Sorry, we don't have products matching your request. Please try a different search term or browse our categories."
                     suggested_products = []
                     confidence_score = 0.0
                 else:
+                    product_context, confidence_score = self._prepare_product_context(relevant_products)
                     suggested_products = [item["product"] for item in relevant_products[:3]]
-                    confidence_score = self._calculate_confidence(relevant_products)
-                    print(f"[WebSocket][{conversation_id}] Suggested products: {[p.name for p in suggested_products]}")
+                    logger.debug("[WebSocket][%s] Suggested products: %s", conversation_id, [p.name for p in suggested_products])
             
             # If fallback, stream fallback message word-by-word and return
             if fallback_message is not None:
-                print(f"[WebSocket][{conversation_id}] Assistant: {fallback_message}")
+                logger.debug("[WebSocket][%s] Assistant: %s", conversation_id, fallback_message)
                 words = fallback_message.split()
                 for word in words:
                     yield WebSocketChatChunk(
@@ -351,16 +800,18 @@ class ChatbotService:
                 assistant_message = ChatMessage(
                     role="assistant", 
                     content=fallback_message, 
-                    timestamp=datetime.now()
+                    timestamp=now
                 )
-                self.conversations[conversation_id].append(assistant_message)
+                conversation.append(assistant_message)
+                self._maybe_summarize(state)
+                await self._conversation_store.append(conversation_id, [user_message, assistant_message])
                 return
             
             # Stream response using OpenAI
             full_response = ""
             async for chunk in self._generate_streaming_response(
                 conversation_id,
-                relevant_products,
+                product_context,
                 request.message,
                 is_asking_for_products,
                 is_voice=request.voice
@@ -377,13 +828,13 @@ class ChatbotService:
             # After streaming, check relevance before sending final chunk
             if is_asking_for_products and suggested_products:
                 is_relevant = await self._are_suggestions_relevant_with_ai(request.message, suggested_products)
-                print(f"[WebSocket][{conversation_id}] LLM relevance (post): {is_relevant}")
+                logger.debug("[WebSocket][%s] LLM relevance (post): %s", conversation_id, is_relevant)
                 if not is_relevant:
                     suggested_products = []
                     confidence_score = 0.0
             
             # Send final chunk with complete data (filtered if needed)
-            print(f"[WebSocket][{conversation_id}] Assistant: {full_response}")
+            logger.debug("[WebSocket][%s] Assistant: %s", conversation_id, full_response)
             yield WebSocketChatChunk(
                 content="",
                 is_final=True,
@@ -396,12 +847,14 @@ class ChatbotService:
             assistant_message = ChatMessage(
                 role="assistant", 
                 content=full_response, 
-                timestamp=datetime.now()
+                timestamp=now
             )
-            self.conversations[conversation_id].append(assistant_message)
+            conversation.append(assistant_message)
+            self._maybe_summarize(state)
+            await self._conversation_store.append(conversation_id, [user_message, assistant_message])
             
-        except Exception as e:
-            print(f"[WebSocket][{conversation_id}] Error: {e}")
+        except Exception:
+            logger.exception("[WebSocket][%s] Error", conversation_id)
             yield WebSocketChatChunk(
                 content="I'm sorry, I'm having trouble processing your request right now. / Maaf, saya mengalami kesulitan memproses permintaan Anda.",
                 is_final=True,
@@ -415,193 +868,146 @@ class ChatbotService:
         # This method should be overridden or monkey-patched in the WebSocket handler to actually send the chunk
         pass
 
+    async def _stream_completion(
+        self,
+        conversation_id: str,
+        product_context: str,
+        current_message: str,
+        is_product_request: bool,
+        is_voice: bool
+    ) -> AsyncGenerator[str, None]:
+        """Yield response text deltas from OpenAI as they are generated"""
+        # Prepare messages for OpenAI - static prefix, recent conversation history, per-turn data
+        messages = self._build_messages(
+            conversation_id, product_context, current_message, is_product_request, is_voice
+        )
+        
+        # Voice replies are one short sentence, so they use a smaller model and token budget
+        model = settings.OPENAI_VOICE_MODEL if is_voice else settings.OPENAI_MODEL
+        max_tokens = 50 if is_voice else 600
+        
+        stream = await self._create_completion(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+
     async def _generate_streaming_response(
         self, 
         conversation_id: str, 
-        relevant_products: List[Dict[str, Any]], 
+        product_context: str, 
         current_message: str, 
         is_product_request: bool, 
         is_voice: bool = False
     ) -> AsyncGenerator[str, None]:
         """Generate streaming response using OpenAI"""
         try:
-            # Prepare messages for OpenAI
-            messages = []
-            conversation_history = self.conversations[conversation_id]
-            
-            # Add all conversation messages
-            for msg in conversation_history:
-                messages.append({"role": msg.role, "content": msg.content})
-            
-            # Add voice-specific instruction if needed
+            async for content in self._stream_completion(
+                conversation_id, product_context, current_message, is_product_request, is_voice
+            ):
+                yield content
+                    
+        except Exception:
+            logger.exception("Error generating streaming OpenAI response")
             if is_voice:
-                voice_instruction = """
-                IMPORTANT: This is a voice response request. Your response must be:
-                - Maximum 1 sentence
-                - Concise and direct
-                - Natural for voice output
-                - Still helpful and informative
-                
-                Respond in the same language as the customer (English or Indonesian).
-                """
+                yield VOICE_RESPONSE_ERROR_MESSAGE
+            else:
+                yield RESPONSE_ERROR_MESSAGE
+
+    def _build_messages(
+        self,
+        conversation_id: str,
+        product_context: str,
+        current_message: str,
+        is_product_request: bool,
+        is_voice: bool
+    ) -> List[Dict[str, str]]:
+        """Build the OpenAI payload for a turn.
+
+        All instructions live in a constant leading system message so the
+        provider's prompt cache can reuse it across turns; only the retrieved
+        products for this turn are appended after the history.
+        """
+        prefix = self._voice_prefix_messages if is_voice else self._static_prefix_messages
+        messages = list(prefix)
+        state = self.conversations.get(conversation_id)
+        if state is not None:
+            if state.summary:
+                messages.append({"role": "system", "content": f"Earlier conversation summary: {state.summary}"})
+            messages.extend(
+                {"role": msg.role, "content": msg.content}
+                for msg in state.unsummarized_messages()[-MAX_HISTORY_MESSAGES:]
+            )
+        
+        if is_product_request:
+            if product_context and product_context != NO_PRODUCTS_CONTEXT:
                 messages.append({
                     "role": "system",
-                    "content": voice_instruction
-                })
-            
-            # Add product context only if this is a product-related request
-            if is_product_request and relevant_products:
-                product_context = self._prepare_product_context(relevant_products)
-                context_message = f"""
-                Product Information for current query "{current_message}":
-                {product_context}
-                
-                Use this product information to help answer the customer's question. Remember to:
-                - Respond in the same language as the customer (English or Indonesian)
-                - Reference their conversation history when relevant
-                - Suggest products that match their stated needs and preferences
-                - Mention current promotions when appropriate
-                {"- Keep response to 1 sentence maximum for voice output" if is_voice else "- Ask follow-up questions to better understand their requirements"}
-                """
-                messages.append({
-                    "role": "system", 
-                    "content": context_message
+                    "content": f'Product Information for current query "{current_message}":\n{product_context}'
                 })
-            
-            # Adjust max_tokens for voice responses
-            max_tokens = 50 if is_voice else 600
-            
-            # Create streaming response (synchronous call)
-            stream = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7,
-                stream=True
-            )
-            
-            # Iterate through stream chunks and yield them
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    content = chunk.choices[0].delta.content
-                    # Add small delay to make streaming visible
-                    await asyncio.sleep(0.02)  # 20ms delay between chunks
-                    yield content
-                    
-        except Exception as e:
-            print(f"Error generating streaming OpenAI response: {e}")
-            if is_voice:
-                yield "Sorry, I'm having trouble right now. / Maaf, saya mengalami masalah."
             else:
-                yield "I apologize, but I'm having trouble generating a response right now. Please try rephrasing your question. / Maaf, saya mengalami kesulitan memberikan respons saat ini. Silakan coba ulangi pertanyaan Anda."
+                messages.append({"role": "system", "content": NO_PRODUCTS_INSTRUCTION})
+        
+        return messages
 
-    def _prepare_product_context(self, relevant_products: List[Dict[str, Any]]) -> str:
-        """Prepare product information for the AI model"""
+    def _prepare_product_context(self, relevant_products: List[Dict[str, Any]]) -> Tuple[str, float]:
+        """Prepare product information for the AI model.
+
+        Returns the context string together with the average similarity score
+        of all relevant products.
+        """
         if not relevant_products:
-            return "No specific products found for this query."
+            return NO_PRODUCTS_CONTEXT, 0.0
         
-        context = f"Here are some relevant products from our {self.brand_id} catalog:\n\n"
+        parts = [self._product_context_header]
         for i, item in enumerate(relevant_products[:5], 1):
             product = item["product"]
             score = item["similarity_score"]
             
-            context += f"{i}. **{product.name}** (Category: {product.category})\n"
-            context += f"   Price: ${product.price:,.2f}\n"
-            context += f"   Description: {product.description}\n"
-            context += f"   Key Features: {', '.join(product.features[:3])}{'...' if len(product.features) > 3 else ''}\n"
-            context += f"   Available: {'Yes' if product.availability else 'No'}\n"
-            context += f"   Relevance Score: {score:.2f}\n\n"
+            product_block = _format_product_block(
+                product.id,
+                product.name,
+                product.category,
+                product.price,
+                product.description,
+                tuple(product.features[:3]),
+                len(product.features) > 3,
+                product.availability
+            )
+            parts.extend([f"{i}. ", product_block, f"   Relevance Score: {score:.2f}\n\n"])
         
-        return context
+        return "".join(parts), self._calculate_confidence(relevant_products)
 
     async def _generate_response(self, conversation_id: str, product_context: str, current_message: str, is_product_request: bool, is_voice: bool = False) -> str:
-        """Generate response using OpenAI with full conversation context"""
+        """Generate a complete response by draining the streaming completion"""
         try:
-            # Prepare messages for OpenAI - include full conversation history
-            messages = []
-            conversation_history = self.conversations[conversation_id]
-            
-            # Add all conversation messages
-            for msg in conversation_history:
-                messages.append({"role": msg.role, "content": msg.content})
-            
-            # Add voice-specific instruction if needed
-            if is_voice:
-                voice_instruction = """
-                IMPORTANT: This is a voice response request. Your response must be:
-                - Maximum 1 sentence
-                - Concise and direct
-                - Natural for voice output
-                - Still helpful and informative
-                
-                Respond in the same language as the customer (English or Indonesian).
-                """
-                messages.append({
-                    "role": "system",
-                    "content": voice_instruction
-                })
-            
-            # Add product context only if this is a product-related request
-            if is_product_request and product_context and product_context != "No specific products found for this query.":
-                context_message = f"""
-                Product Information for current query "{current_message}":
-                {product_context}
-                
-                Use this product information to help answer the customer's question. Remember to:
-                - Respond in the same language as the customer (English or Indonesian)
-                - Reference their conversation history when relevant
-                - Suggest products that match their stated needs and preferences
-                - Mention current promotions when appropriate
-                {"- Keep response to 1 sentence maximum for voice output" if is_voice else "- Ask follow-up questions to better understand their requirements"}
-                """
-                messages.append({
-                    "role": "system", 
-                    "content": context_message
-                })
-            elif is_product_request and not product_context:
-                # If asking for products but none found
-                no_products_message = f"""
-                The customer is asking for product recommendations, but no matching products were found in the database. 
-                Please acknowledge their request and suggest they:
-                1. Try different search terms
-                2. Contact our support team for personalized assistance
-                3. Browse our website categories
-                
-                Respond in the same language as the customer.
-                {"Keep response to 1 sentence maximum for voice output." if is_voice else ""}
-                """
-                messages.append({
-                    "role": "system",
-                    "content": no_products_message
-                })
-            
-            # Adjust max_tokens for voice responses
-            max_tokens = 50 if is_voice else 600
-            
-            response = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            response_content = response.choices[0].message.content
+            parts = [
+                content async for content in self._stream_completion(
+                    conversation_id, product_context, current_message, is_product_request, is_voice
+                )
+            ]
+            response_content = "".join(parts)
             
             # Additional safety check for voice responses - ensure it's truly 1 sentence
             if is_voice:
-                # Split by sentence-ending punctuation and take first sentence
-                import re
-                sentences = re.split(r'[.!?]+', response_content)
-                if sentences and sentences[0].strip():
-                    response_content = sentences[0].strip() + "."
+                # Take the text up to the first sentence-ending punctuation
+                first_sentence = _FIRST_SENTENCE_RE.match(response_content).group().strip()
+                if first_sentence:
+                    response_content = first_sentence + "."
             
             return response_content
             
-        except Exception as e:
-            print(f"Error generating OpenAI response: {e}")
+        except Exception:
+            logger.exception("Error generating OpenAI response")
             if is_voice:
-                return "Sorry, I'm having trouble right now. / Maaf, saya mengalami masalah."
-            return "I apologize, but I'm having trouble generating a response right now. Please try rephrasing your question. / Maaf, saya mengalami kesulitan memberikan respons saat ini. Silakan coba ulangi pertanyaan Anda."
+                return VOICE_RESPONSE_ERROR_MESSAGE
+            return RESPONSE_ERROR_MESSAGE
 
     def _calculate_confidence(self, relevant_products: List[Dict[str, Any]]) -> float:
         """Calculate confidence score based on product relevance"""
@@ -609,13 +1015,17 @@ class ChatbotService:
             return 0.0
         
         # Average similarity score of all relevant products
-        scores = [item["similarity_score"] for item in relevant_products]
-        return sum(scores) / len(scores)
+        scores = np.fromiter(
+            (item["similarity_score"] for item in relevant_products),
+            dtype=np.float64,
+            count=len(relevant_products)
+        )
+        return float(scores.mean())
 
     async def get_product_recommendations(self, query: str, limit: int = 5) -> ProductRecommendation:
         """Get specific product recommendations based on a query"""
         try:
-            relevant_products = self.vector_store.search_products(query, limit)
+            relevant_products = await self._search_products(query, limit)
             
             if not relevant_products:
                 return ProductRecommendation(
@@ -625,10 +1035,19 @@ class ChatbotService:
                 )
             
             products = [item["product"] for item in relevant_products]
-            avg_score = sum(item["similarity_score"] for item in relevant_products) / len(relevant_products)
+            product_info, avg_score = self._prepare_product_context(relevant_products)
             
-            # Generate reasoning using OpenAI
-            reasoning = await self._generate_recommendation_reasoning(query, relevant_products)
+            if avg_score < MIN_REASONING_MATCH_SCORE:
+                # Matches are too weak to be worth an LLM explanation
+                reasoning = "Here are the closest matches we could find for your request. / Berikut produk yang paling mendekati permintaan Anda."
+            else:
+                # Generate reasoning using OpenAI, reusing it for the same query and products
+                cache_key = self._reasoning_cache_key(query, products)
+                reasoning = self._get_cached_reasoning(cache_key)
+                if reasoning is None:
+                    reasoning = await self._generate_recommendation_reasoning(query, product_info)
+                    if reasoning != REASONING_FALLBACK:
+                        self.store_reasoning(cache_key, reasoning)
             
             return ProductRecommendation(
                 products=products,
@@ -636,51 +1055,87 @@ class ChatbotService:
                 match_score=avg_score
             )
             
-        except Exception as e:
-            print(f"Error getting recommendations: {e}")
+        except Exception:
+            logger.exception("Error getting recommendations")
             return ProductRecommendation(
                 products=[],
                 reasoning="Error retrieving recommendations. Please try again or contact support.",
                 match_score=0.0
             )
 
-    async def _generate_recommendation_reasoning(self, query: str, relevant_products: List[Dict[str, Any]]) -> str:
+    def _reasoning_cache_key(self, query: str, products: List[Product]) -> Tuple[int, bytes]:
+        # Hash full product content so price or spec changes miss the cache
+        content = "\0".join([" ".join(query.lower().split()), *(p.model_dump_json() for p in products)])
+        return (
+            self.vector_store.catalog_version,
+            hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        )
+
+    def _get_cached_reasoning(self, cache_key: Tuple) -> Optional[str]:
+        cached = self._reasoning_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < REASONING_CACHE_TTL_SECONDS:
+            return cached[1]
+        return None
+
+    async def prepare_reasoning_request(self, query: str, limit: int = 5) -> Optional[Tuple[Tuple, str]]:
+        """Return the reasoning cache key and prompt for a query, or None if no LLM call is needed.
+
+        Used to precompute reasoning offline; mirrors the checks in get_product_recommendations.
+        """
+        relevant_products = await self._search_products(query, limit)
+        if not relevant_products:
+            return None
+        
+        product_info, avg_score = self._prepare_product_context(relevant_products)
+        if avg_score < MIN_REASONING_MATCH_SCORE:
+            return None
+        
+        cache_key = self._reasoning_cache_key(query, [item["product"] for item in relevant_products])
+        if self._get_cached_reasoning(cache_key) is not None:
+            return None
+        return cache_key, self._build_reasoning_prompt(query, product_info)
+
+    def store_reasoning(self, cache_key: Tuple, reasoning: str):
+        """Store precomputed recommendation reasoning"""
+        self._reasoning_cache.set(cache_key, (time.monotonic(), reasoning))
+
+    def _build_reasoning_prompt(self, query: str, product_info: str) -> str:
+        """Build the recommendation reasoning prompt in the query's language"""
+        if _is_indonesian(query):
+            prompt = f"""
+            Pertanyaan Pelanggan: "{query}"
+
+            {product_info}
+
+            Sebagai customer service {self.brand_id}, berikan penjelasan singkat (2-3 kalimat) dalam Bahasa Indonesia
+            mengapa produk-produk ini merupakan rekomendasi yang baik untuk pertanyaan pelanggan. Fokuskan pada:
+            - Bagaimana produk-produk ini sesuai dengan kebutuhan spesifik mereka
+            - Manfaat dan fitur utama yang relevan
+            - Promosi terkini yang mungkin berlaku
+            - Proposisi nilai untuk penggunaan bisnis/profesional
+            """
+        else:
+            prompt = f"""
+            Customer Query: "{query}"
+
+            {product_info}
+
+            As a {self.brand_id} customer service representative, provide a brief explanation (2-3 sentences) 
+            of why these products are good recommendations for this customer's query. Focus on:
+            - How the products match their specific needs
+            - Key benefits and features that are relevant
+            - Any current promotions that might apply
+            - Value proposition for business/professional use
+            """
+        
+        return prompt
+
+    async def _generate_recommendation_reasoning(self, query: str, product_info: str) -> str:
         """Generate reasoning for product recommendations with multilingual support"""
         try:
-            product_info = self._prepare_product_context(relevant_products)
-            
-            # Detect if query is in Indonesian
-            indonesian_keywords = ['saya', 'butuh', 'perlu', 'cari', 'mau', 'ingin', 'untuk', 'yang', 'apa', 'bagaimana']
-            is_indonesian = any(keyword in query.lower() for keyword in indonesian_keywords)
-            
-            if is_indonesian:
-                prompt = f"""
-                Pertanyaan Pelanggan: "{query}"
-                
-                {product_info}
-                
-                Sebagai customer service {self.brand_id}, berikan penjelasan singkat (2-3 kalimat) dalam Bahasa Indonesia
-                mengapa produk-produk ini merupakan rekomendasi yang baik untuk pertanyaan pelanggan. Fokuskan pada:
-                - Bagaimana produk-produk ini sesuai dengan kebutuhan spesifik mereka
-                - Manfaat dan fitur utama yang relevan
-                - Promosi terkini yang mungkin berlaku
-                - Proposisi nilai untuk penggunaan bisnis/profesional
-                """
-            else:
-                prompt = f"""
-                Customer Query: "{query}"
-                
-                {product_info}
-                
-                As a {self.brand_id} customer service representative, provide a brief explanation (2-3 sentences) 
-                of why these products are good recommendations for this customer's query. Focus on:
-                - How the products match their specific needs
-                - Key benefits and features that are relevant
-                - Any current promotions that might apply
-                - Value proposition for business/professional use
-                """
-            
-            response = self.openai_client.chat.completions.create(
+            prompt = self._build_reasoning_prompt(query, product_info)
+            
+            response = await self._create_completion(
                 model=settings.OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=250,
@@ -689,33 +1144,37 @@ class ChatbotService:
             
             return response.choices[0].message.content
             
-        except Exception as e:
-            print(f"Error generating reasoning: {e}")
+        except Exception:
+            logger.exception("Error generating reasoning")
             # Fallback response in both languages
-            return "These products were selected based on their relevance to your query and our expertise in matching technology solutions to professional needs. / Produk-produk ini dipilih berdasarkan relevansinya dengan pertanyaan Anda dan keahlian kami dalam mencocokkan solusi teknologi dengan kebutuhan profesional."
+            return REASONING_FALLBACK
 
     def get_conversation_history(self, conversation_id: str) -> List[ChatMessage]:
         """Get conversation history"""
-        history = self.conversations.get(conversation_id, [])
-        # Filter out system messages for cleaner display
-        return [msg for msg in history if msg.role != "system"]
+        state = self.conversations.get(conversation_id)
+        return list(state.messages) if state else []
 
     def get_conversation_summary(self, conversation_id: str) -> str:
         """Get a summary of the conversation for context"""
-        history = self.get_conversation_history(conversation_id)
-        if not history:
+        # Slice the stored list directly rather than copying the whole history first
+        state = self.conversations.get(conversation_id)
+        if state is None or not state.messages:
             return "No conversation history."
+        history = state.messages
         
         summary_parts = []
         for msg in history[-6:]:  # Last 6 messages for context
             role_emoji = "👤" if msg.role == "user" else "🤖"
-            content_preview = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
+            content = msg.content
+            content_preview = content[:100] + "..." if len(content) > 100 else content
             summary_parts.append(f"{role_emoji} {content_preview}")
         
         return "\n".join(summary_parts)
 
     def clear_conversation(self, conversation_id: str) -> bool:
         """Clear a conversation"""
+        if self._conversation_store.enabled:
+            self._spawn_background(self._conversation_store.delete(conversation_id))
         if conversation_id in self.conversations:
             del self.conversations[conversation_id]
             return True
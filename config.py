@@ -1,17 +1,46 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Settings:
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
-    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
-    CHROMA_PERSIST_DIRECTORY: str = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
-    
-    # Validate required settings
-    def __post_init__(self):
-        if not self.OPENAI_API_KEY:
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    # Read once from the environment / .env file and validated at startup
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4"
+    OPENAI_SUMMARY_MODEL: str = "gpt-4o-mini"
+    OPENAI_CLASSIFIER_MODEL: str = "gpt-4o-mini"
+    OPENAI_VOICE_MODEL: str = "gpt-4o-mini"
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
+
+    # Optional Redis for conversation history shared across workers
+    REDIS_URL: Optional[str] = None
+    CONVERSATION_TTL_SECONDS: int = 86400
+
+    # SQLite database holding the upload history
+    UPLOADS_DB_PATH: str = "./uploads.db"
+
+    # SQLite database caching product embeddings across restarts
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.db"
+
+    # Largest accepted product upload, in bytes
+    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024
+
+    @field_validator("OPENAI_API_KEY")
+    @classmethod
+    def _require_api_key(cls, value: str) -> str:
+        if not value:
             raise ValueError("OPENAI_API_KEY is required")
+        return value
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
+
 
-settings = Settings() 
\ No newline at end of file
+settings = get_settings()
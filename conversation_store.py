@@ -0,0 +1,90 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    import msgpack
+    import redis.asyncio as aioredis
+except ImportError:
+    msgpack = None
+    aioredis = None
+
+from config import settings
+from models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# One client (and connection pool) per Redis URL, shared by every brand's store
+_redis_clients: Dict[str, "aioredis.Redis"] = {}
+
+
+def _get_redis_client(redis_url: str) -> "aioredis.Redis":
+    client = _redis_clients.get(redis_url)
+    if client is None:
+        client = _redis_clients[redis_url] = aioredis.from_url(redis_url)
+    return client
+
+
+class ConversationStore:
+    """Redis-backed conversation history shared by all workers.
+
+    Each conversation is a Redis list of msgpack-encoded messages that expires
+    after CONVERSATION_TTL_SECONDS of inactivity. Configure the server with
+    ``maxmemory-policy allkeys-lru`` so idle conversations are evicted under
+    memory pressure. When REDIS_URL is unset (or redis/msgpack aren't
+    installed) the store is disabled and every call is a no-op.
+    """
+
+    def __init__(self, brand_id: str, redis_url: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        self.brand_id = brand_id
+        self.ttl_seconds = ttl_seconds or settings.CONVERSATION_TTL_SECONDS
+        redis_url = redis_url or settings.REDIS_URL
+        self._redis = _get_redis_client(redis_url) if (redis_url and aioredis) else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    def _key(self, conversation_id: str) -> str:
+        return f"conv:{self.brand_id}:{conversation_id}"
+
+    @staticmethod
+    def _encode(message: ChatMessage) -> bytes:
+        return msgpack.packb({"r": message.role, "c": message.content, "t": message.timestamp.timestamp()})
+
+    @staticmethod
+    def _decode(blob: bytes) -> ChatMessage:
+        data = msgpack.unpackb(blob)
+        return ChatMessage(role=data["r"], content=data["c"], timestamp=datetime.fromtimestamp(data["t"], tz=timezone.utc))
+
+    async def load(self, conversation_id: str) -> List[ChatMessage]:
+        """Load a conversation's messages, oldest first"""
+        if not self.enabled:
+            return []
+        try:
+            blobs = await self._redis.lrange(self._key(conversation_id), 0, -1)
+            return [self._decode(blob) for blob in blobs]
+        except Exception:
+            logger.exception("Error loading conversation %s from Redis", conversation_id)
+            return []
+
+    async def append(self, conversation_id: str, messages: List[ChatMessage]):
+        """Append messages to a conversation and refresh its expiry"""
+        if not self.enabled or not messages:
+            return
+        key = self._key(conversation_id)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.rpush(key, *(self._encode(message) for message in messages))
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception:
+            logger.exception("Error saving conversation %s to Redis", conversation_id)
+
+    async def delete(self, conversation_id: str):
+        if not self.enabled:
+            return
+        try:
+            await self._redis.delete(self._key(conversation_id))
+        except Exception:
+            logger.exception("Error deleting conversation %s from Redis", conversation_id)
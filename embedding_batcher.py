@@ -0,0 +1,103 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from openai_client import get_async_openai_client, get_openai_semaphore
+
+
+class BatchingEmbedder:
+    """Coalesce concurrent embedding requests into one multi-input call.
+
+    Texts submitted within ``max_wait_ms`` of each other (up to ``max_batch``)
+    are deduplicated and embedded with a single ``embed_fn`` call, which takes
+    a list of texts and returns their embeddings in the same order. The worker
+    task is started on first use so it binds to the running event loop.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch: int = 64,
+        max_wait_ms: float = 50
+    ):
+        self._embed = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        """Queue a text and wait for its embedding"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Identical texts in one window share a single input
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await self._embed(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text: Dict[str, List[float]] = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    async def close(self):
+        """Stop the worker; batches already dispatched are left to finish"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+async def _embed_texts(texts: List[str]) -> List[List[float]]:
+    async with get_openai_semaphore():
+        response = await get_async_openai_client().embeddings.create(
+            model=settings.EMBEDDING_MODEL,
+            input=texts
+        )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+# Query-time embeddings from every caller are coalesced into shared requests
+_embedder = BatchingEmbedder(_embed_texts)
+
+
+async def embed_batched(text: str) -> List[float]:
+    """Embed one text, batched with other concurrent embedding requests"""
+    return await _embedder.embed(text)
@@ -0,0 +1,141 @@
+import hashlib
+import sqlite3
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from cache_utils import LRUCache
+from config import settings
+
+# Query embeddings kept in memory, shared by all brands. Stored as float32 arrays:
+# a 1536-d embedding is 6 KB that way instead of ~50 KB as a list of Python floats.
+EMBEDDING_CACHE_SIZE = 10000
+
+_embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+
+# Product document embeddings kept in memory in front of the on-disk cache
+DOCUMENT_EMBEDDING_MEMORY_SIZE = 10000
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share an entry"""
+    return " ".join(text.lower().split())
+
+
+def _cache_key(text: str, model: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{normalize_query(text)}".encode("utf-8")).digest()
+
+
+def get_cached_embedding(text: str, model: Optional[str] = None) -> Optional[List[float]]:
+    vector = _embedding_cache.get(_cache_key(text, model or settings.EMBEDDING_MODEL))
+    return vector.tolist() if vector is not None else None
+
+
+def cache_embedding(text: str, embedding: List[float], model: Optional[str] = None):
+    _embedding_cache.set(
+        _cache_key(text, model or settings.EMBEDDING_MODEL),
+        np.asarray(embedding, dtype=np.float32)
+    )
+
+
+def embed_query_cached(text: str, embed_fn: Callable[[str], List[float]]) -> List[float]:
+    """Return the embedding of a search query, calling embed_fn only on a cache miss"""
+    embedding = get_cached_embedding(text)
+    if embedding is None:
+        embedding = embed_fn(text)
+        cache_embedding(text, embedding)
+    return embedding
+
+
+async def aembed_query_cached(text: str, embed_fn: Callable[[str], Awaitable[List[float]]]) -> List[float]:
+    """Async variant of embed_query_cached"""
+    embedding = get_cached_embedding(text)
+    if embedding is None:
+        embedding = await embed_fn(text)
+        cache_embedding(text, embedding)
+    return embedding
+
+
+class DocumentEmbeddingCache:
+    """Product document embeddings persisted in SQLite, keyed by content hash.
+
+    Re-ingesting an unchanged product (restart, repeated upload, no-op
+    update) is a lookup instead of an embeddings request. Vectors are stored
+    as float32 bytes; recent ones are also kept in an in-memory LRU as float32
+    arrays, and only turned into lists when handed back by embed_many.
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_size: int = DOCUMENT_EMBEDDING_MEMORY_SIZE):
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self._memory = LRUCache(maxsize=memory_size)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha256(f"{settings.EMBEDDING_MODEL}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Cached embeddings (float32 arrays) for whichever of texts have one"""
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        for text in texts:
+            key = self._key(text)
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                found[text] = embedding
+            else:
+                missing[key] = text
+        if not missing:
+            return found
+
+        keys = list(missing)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+        for key, blob in rows:
+            embedding = np.frombuffer(blob, dtype=np.float32)
+            self._memory.set(key, embedding)
+            found[missing[key]] = embedding
+        return found
+
+    def set_many(self, embeddings: Dict[str, List[float]]):
+        rows = []
+        for text, embedding in embeddings.items():
+            key = self._key(text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._memory.set(key, vector)
+            rows.append((key, vector.tobytes()))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def embed_many(self, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """Embeddings for texts in order, calling embed_fn once for all cache misses"""
+        cached: Dict[str, List[float]] = {text: vector.tolist() for text, vector in self.get_many(texts).items()}
+        misses = [text for text in dict.fromkeys(texts) if text not in cached]
+        if misses:
+            fresh = dict(zip(misses, embed_fn(misses)))
+            self.set_many(fresh)
+            cached.update(fresh)
+        return [cached[text] for text in texts]
+
+
+_document_cache: Optional[DocumentEmbeddingCache] = None
+_document_cache_lock = threading.Lock()
+
+
+def get_document_embedding_cache() -> DocumentEmbeddingCache:
+    """Return the process-wide document embedding cache, opening it on first use"""
+    global _document_cache
+    if _document_cache is None:
+        with _document_cache_lock:
+            if _document_cache is None:
+                _document_cache = DocumentEmbeddingCache()
+    return _document_cache
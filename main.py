@@ -1,28 +1,60 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, WebSocket, WebSocketDisconnect, Query
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, WebSocket, WebSocketDisconnect, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, ORJSONResponse
+from typing import List, Optional, Dict, Set, Tuple
 import uvicorn
+import asyncio
+import logging
+import aiofiles
 from datetime import datetime
+import csv
+import xml.etree.ElementTree as ET
 import json
 import uuid
 import os
+import time
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from models import (
     Product, ChatRequest, ChatResponse, ProductQuery, 
     ProductRecommendation, ChatMessage, FileUpload, FileUploadResponse,
     Brand, BrandConfig, WebSocketMessage, WebSocketChatRequest, WebSocketChatChunk,
-    SystemPromptRequest, BrandConfigUpdateRequest
+    SystemPromptRequest, BrandConfigUpdateRequest, ReasoningWarmupRequest
 )
 from chatbot_service import ChatbotService
-from vector_store import VectorStore
 from brand_service import BrandService
+from batch_service import submit_reasoning_batch
+from openai_client import close_async_openai_client
+from response_cache import SemanticResponseCache
+from embedding_batcher import embed_batched
+from embedding_cache import aembed_query_cached
+from upload_store import UploadStore
+from vector_store import SEARCH_RESULT_TTL_SECONDS
 from config import settings
+from sample_data import SAMPLE_PRODUCTS
+from logging_setup import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Multi-Brand Customer Service Chatbot API",
     description="A backend API for multi-brand customer service chatbots with product recommendations and WebSocket streaming",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson encodes large product lists much faster than the stdlib encoder
+    default_response_class=ORJSONResponse if orjson else JSONResponse
 )
 
 # Add CORS middleware
@@ -34,12 +66,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (product lists, search results) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize services
 brand_service = BrandService()
 
-# File upload tracking
-uploaded_files: List[FileUpload] = []
+# File upload history, persisted so it survives restarts and is shared by all workers
+upload_store = UploadStore()
 UPLOAD_DIR = "uploads"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -47,78 +83,122 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Sets so disconnecting is O(1) however many sockets a brand has
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
     
     async def connect(self, websocket: WebSocket, brand_id: str):
         await websocket.accept()
-        if brand_id not in self.active_connections:
-            self.active_connections[brand_id] = []
-        self.active_connections[brand_id].append(websocket)
+        self.active_connections.setdefault(brand_id, set()).add(websocket)
     
     def disconnect(self, websocket: WebSocket, brand_id: str):
-        if brand_id in self.active_connections:
-            if websocket in self.active_connections[brand_id]:
-                self.active_connections[brand_id].remove(websocket)
+        connections = self.active_connections.get(brand_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.active_connections[brand_id]
     
     async def send_message(self, message: dict, websocket: WebSocket):
-        await websocket.send_json(message)
+        # Called once per streamed chunk, so encode with orjson when available
+        if orjson:
+            await websocket.send_text(orjson.dumps(message).decode("utf-8"))
+        else:
+            await websocket.send_json(message)
+    
+    async def broadcast(self, message: dict, brand_id: str) -> int:
+        """Send a message to every socket of a brand at once; returns how many received it.
+
+        The message is encoded once, and sockets whose send fails are dropped.
+        """
+        connections = list(self.active_connections.get(brand_id, ()))
+        if not connections:
+            return 0
+        text = orjson.dumps(message).decode("utf-8") if orjson else json.dumps(message)
+        results = await asyncio.gather(
+            *(websocket.send_text(text) for websocket in connections),
+            return_exceptions=True
+        )
+        delivered = 0
+        for websocket, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(websocket, brand_id)
+            else:
+                delivered += 1
+        return delivered
 
 connection_manager = ConnectionManager()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application on startup"""
-    print("🚀 Starting Multi-Brand Customer Service Chatbot API...")
-    print(f"OpenAI Model: {settings.OPENAI_MODEL}")
-    print(f"Embedding Model: {settings.EMBEDDING_MODEL}")
-    print(f"Chroma DB Path: {settings.CHROMA_PERSIST_DIRECTORY}")
+    logger.info("Starting Multi-Brand Customer Service Chatbot API")
+    logger.info("OpenAI Model: %s", settings.OPENAI_MODEL)
+    logger.info("Embedding Model: %s", settings.EMBEDDING_MODEL)
+    logger.info("Chroma DB Path: %s", settings.CHROMA_PERSIST_DIRECTORY)
     
     # List active brands
     active_brands = brand_service.get_active_brands()
-    print(f"🏢 Active Brands: {len(active_brands)}")
+    logger.info("Active Brands: %s", len(active_brands))
     for brand in active_brands:
-        print(f"   - {brand.name} (ID: {brand.id})")
+        logger.info("   - %s (ID: %s)", brand.name, brand.id)
     
     # Auto-populate sample data for default brand if database is empty
     try:
-        default_vector_store = VectorStore(brand_id="techpro")
-        existing_products = default_vector_store.get_all_products()
-        if len(existing_products) == 0:
-            print("📚 TechPro database is empty. Loading sample data...")
+        default_vector_store = await _get_vector_store("techpro")
+        # Metadata-only count; no need to hydrate every product just to see if there are any
+        counts = await asyncio.to_thread(default_vector_store.get_catalog_counts)
+        if counts.total == 0:
+            logger.info("TechPro database is empty. Loading sample data...")
             await populate_sample_data("techpro")
-            print("✅ Sample data loaded successfully!")
+            logger.info("Sample data loaded successfully")
         else:
-            print(f"📊 Found {len(existing_products)} existing products in TechPro database")
-    except Exception as e:
-        print(f"⚠️ Error checking/loading sample data: {e}")
+            logger.info("Found %s existing products in TechPro database", counts.total)
+    except Exception:
+        logger.exception("Error checking/loading sample data")
+    
+    # Build chatbots and load each brand's index now rather than on its first request
+    await asyncio.to_thread(brand_service.warmup)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist pending state and release shared connections before the application exits"""
+    brand_service.flush()
+    await close_async_openai_client()
+    await upload_store.close()
+
+async def _get_vector_store(brand_id: str):
+    """Brand's vector store; opening its Chroma collection the first time runs in a worker thread"""
+    vector_store = brand_service.peek_vector_store(brand_id)
+    if vector_store is None:
+        vector_store = await asyncio.to_thread(brand_service.get_vector_store, brand_id)
+    return vector_store
 
 async def populate_sample_data(brand_id: str):
     """Populate the database with sample products for a specific brand"""
-    from sample_data import SAMPLE_PRODUCTS
-    
-    vector_store = VectorStore(brand_id=brand_id)
-    success_count = 0
-    for product in SAMPLE_PRODUCTS:
-        try:
-            if vector_store.add_product(product):
-                success_count += 1
-        except Exception as e:
-            print(f"❌ Failed to add {product.name}: {e}")
+    vector_store = await _get_vector_store(brand_id)
+    success_count = sum(await asyncio.to_thread(vector_store.add_products, SAMPLE_PRODUCTS))
     
-    print(f"📦 Successfully loaded {success_count}/{len(SAMPLE_PRODUCTS)} sample products for {brand_id}")
+    logger.info("Successfully loaded %s/%s sample products for %s", success_count, len(SAMPLE_PRODUCTS), brand_id)
+
+# Health check payload, rebuilt at most once per second however often it's polled
+HEALTH_CACHE_SECONDS = 1.0
+_health_cache: Optional[Tuple[float, dict]] = None
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    active_brands = brand_service.get_active_brands()
-    return {
-        "message": "Multi-Brand Customer Service Chatbot API",
-        "status": "running",
-        "version": "2.0.0",
-        "timestamp": datetime.now().isoformat(),
-        "active_brands": len(active_brands),
-        "brands": [{"id": b.id, "name": b.name} for b in active_brands]
-    }
+    global _health_cache
+    now = time.monotonic()
+    if _health_cache is None or now - _health_cache[0] >= HEALTH_CACHE_SECONDS:
+        active_brands = brand_service.get_active_brands()
+        _health_cache = (now, {
+            "message": "Multi-Brand Customer Service Chatbot API",
+            "status": "running",
+            "version": "2.0.0",
+            "timestamp": datetime.now().isoformat(),
+            "active_brands": len(active_brands),
+            "brands": [{"id": b.id, "name": b.name} for b in active_brands]
+        })
+    return _health_cache[1]
 
 # Brand Management Endpoints
 @app.post("/brands", response_model=Brand)
@@ -166,7 +246,8 @@ async def update_brand(
 @app.delete("/brands/{brand_id}")
 async def delete_brand(brand_id: str):
     """Delete a brand and all its data"""
-    success = brand_service.delete_brand(brand_id)
+    # Dropping the Chroma collection is blocking I/O
+    success = await asyncio.to_thread(brand_service.delete_brand, brand_id)
     if not success:
         raise HTTPException(status_code=404, detail="Brand not found")
     return {"message": "Brand deleted successfully"}
@@ -195,7 +276,7 @@ async def update_brand_config(
 @app.get("/brands/{brand_id}/stats")
 async def get_brand_stats(brand_id: str):
     """Get brand statistics"""
-    stats = brand_service.get_brand_stats(brand_id)
+    stats = await asyncio.to_thread(brand_service.get_brand_stats, brand_id)
     if not stats:
         raise HTTPException(status_code=404, detail="Brand not found")
     return stats
@@ -327,7 +408,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, brand_id: str):
     except WebSocketDisconnect:
         connection_manager.disconnect(websocket, brand_id)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error")
         await connection_manager.send_message({
             "type": "error",
             "data": {"message": f"Server error: {str(e)}"}
@@ -396,7 +477,7 @@ async def websocket_voice_chat_endpoint(websocket: WebSocket, brand_id: str):
     except WebSocketDisconnect:
         connection_manager.disconnect(websocket, brand_id)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error")
         await connection_manager.send_message({
             "type": "error",
             "data": {"message": f"Server error: {str(e)}"}
@@ -405,18 +486,46 @@ async def websocket_voice_chat_endpoint(websocket: WebSocket, brand_id: str):
 
 # Traditional Chat Endpoints (with brand support)
 @app.post("/chat/{brand_id}", response_model=ChatResponse)
-async def chat_with_brand_bot(brand_id: str, request: ChatRequest):
-    """Chat with a specific brand's chatbot"""
+async def chat_with_brand_bot(brand_id: str, request: ChatRequest, no_cache: bool = False):
+    """Chat with a specific brand's chatbot; no_cache=true bypasses the semantic response cache"""
     try:
         chatbot_service = brand_service.get_chatbot_instance(brand_id)
         if not chatbot_service:
             raise HTTPException(status_code=404, detail=f"Brand '{brand_id}' not found or inactive")
         
-        response = await chatbot_service.chat(request)
+        response = await chatbot_service.chat(request, use_cache=not no_cache)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.post("/chat/{brand_id}/stream")
+async def stream_chat_with_brand_bot(brand_id: str, request: ChatRequest):
+    """Chat with a specific brand's chatbot, streaming the reply as Server-Sent Events"""
+    chatbot_service = brand_service.get_chatbot_instance(brand_id)
+    if not chatbot_service:
+        raise HTTPException(status_code=404, detail=f"Brand '{brand_id}' not found or inactive")
+    
+    stream_request = WebSocketChatRequest(
+        message=request.message,
+        brand_id=brand_id,
+        conversation_id=request.conversation_id,
+        user_id=request.user_id,
+        voice=request.voice
+    )
+    
+    async def event_stream():
+        # Same chunk types as the WebSocket endpoint: "chunk" while streaming, "complete" at the end
+        async for chunk in chatbot_service.chat_stream(stream_request):
+            event_type = "complete" if chunk.is_final else "chunk"
+            yield f"event: {event_type}\ndata: {chunk.model_dump_json()}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # An explicit encoding keeps GZipMiddleware from buffering the event stream
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"}
+    )
+
 # Legacy endpoint (defaults to techpro)
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_bot(request: ChatRequest):
@@ -449,16 +558,33 @@ async def clear_conversation(brand_id: str, conversation_id: str):
     else:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
+# Catalog listings are revalidated with weak ETags built from the catalog version and the time the
+# cached data was loaded (so changes from other workers show up). The epoch keeps tags from colliding
+# across restarts, where versions start over.
+_ETAG_EPOCH = uuid.uuid4().hex[:8]
+CATALOG_CACHE_CONTROL = "public, max-age=30"
+
+def _catalog_etag(brand_id: str, version: int, loaded_at: float) -> str:
+    return f'W/"{_ETAG_EPOCH}-{brand_id}-{version}-{int(loaded_at * 1000)}"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has this version, otherwise set caching headers"""
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 # Product Management Endpoints (with brand support)
 @app.post("/brands/{brand_id}/products")
 async def add_product_to_brand(brand_id: str, product: Product, background_tasks: BackgroundTasks):
     """Add a new product to a specific brand's catalog"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        success = vector_store.add_product(product)
+        vector_store = await _get_vector_store(brand_id)
+        success = await asyncio.to_thread(vector_store.add_product, product)
         if success:
             return {"message": "Product added successfully", "product_id": product.id, "brand_id": brand_id}
         else:
@@ -467,18 +593,18 @@ async def add_product_to_brand(brand_id: str, product: Product, background_tasks
         raise HTTPException(status_code=500, detail=f"Error adding product: {str(e)}")
 
 @app.get("/brands/{brand_id}/products", response_model=List[Product])
-async def get_brand_products(brand_id: str):
+async def get_brand_products(brand_id: str, request: Request, response: Response):
     """Get all products from a specific brand's catalog"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        products = vector_store.get_all_products()
-        # Set brand_id for each product
-        for product in products:
-            product.brand_id = brand_id
-        return products
+        vector_store = await _get_vector_store(brand_id)
+        snapshot = await asyncio.to_thread(vector_store.get_catalog_snapshot)
+        not_modified = _not_modified(request, response, _catalog_etag(brand_id, snapshot.version, snapshot.loaded_at))
+        if not_modified:
+            return not_modified
+        return list(snapshot.products)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving products: {str(e)}")
 
@@ -489,26 +615,22 @@ async def add_product(product: Product, background_tasks: BackgroundTasks):
     return await add_product_to_brand("techpro", product, background_tasks)
 
 @app.get("/products", response_model=List[Product])
-async def get_all_products():
+async def get_all_products(request: Request, response: Response):
     """Get all products from the default catalog"""
-    products = await get_brand_products("techpro")
-    # If get_brand_products returns a Response, just return it
-    if isinstance(products, list):
-        return products
-    return products
+    return await get_brand_products("techpro", request, response)
 
 @app.put("/brands/{brand_id}/products/{product_id}")
 async def update_brand_product(brand_id: str, product_id: str, product: Product, background_tasks: BackgroundTasks):
     """Update an existing product in a specific brand's catalog"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
         if product.id != product_id:
             raise HTTPException(status_code=400, detail="Product ID mismatch")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        success = vector_store.update_product(product)
+        vector_store = await _get_vector_store(brand_id)
+        success = await asyncio.to_thread(vector_store.update_product, product)
         if success:
             return {"message": "Product updated successfully"}
         else:
@@ -520,11 +642,11 @@ async def update_brand_product(brand_id: str, product_id: str, product: Product,
 async def delete_brand_product(brand_id: str, product_id: str):
     """Delete a product from a specific brand's catalog"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        success = vector_store.delete_product(product_id)
+        vector_store = await _get_vector_store(brand_id)
+        success = await asyncio.to_thread(vector_store.delete_product, product_id)
         if success:
             return {"message": "Product deleted successfully"}
         else:
@@ -533,39 +655,65 @@ async def delete_brand_product(brand_id: str, product_id: str):
         raise HTTPException(status_code=500, detail=f"Error deleting product: {str(e)}")
 
 # Product Search and Recommendation Endpoints (with brand support)
+
+# Near-duplicate searches (same filters, cosine >= threshold) reuse an earlier
+# result payload; entries are bucketed by catalog version so local writes invalidate
+# them, and expire with the underlying search results for writes from other workers
+SEARCH_RESPONSE_CACHE_THRESHOLD = 0.9
+SEARCH_RESPONSE_CACHE_TTL_SECONDS = SEARCH_RESULT_TTL_SECONDS
+
+_search_response_cache = SemanticResponseCache(
+    threshold=SEARCH_RESPONSE_CACHE_THRESHOLD,
+    ttl=SEARCH_RESPONSE_CACHE_TTL_SECONDS,
+    max_buckets=256
+)
+
 @app.post("/brands/{brand_id}/products/search")
-async def search_brand_products(brand_id: str, query: ProductQuery):
-    """Search for products in a specific brand's catalog"""
+async def search_brand_products(brand_id: str, query: ProductQuery, no_cache: bool = False):
+    """Search for products in a specific brand's catalog; no_cache=true bypasses the semantic cache"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
+        vector_store = await _get_vector_store(brand_id)
         
-        if query.category:
-            results = vector_store.search_by_category(query.category, query.limit)
-        else:
-            results = vector_store.search_products(query.query, query.limit)
+        # Embed on the event loop so concurrent searches share one embeddings request;
+        # on failure the vector store embeds the query itself
+        try:
+            query_embedding = await aembed_query_cached(query.query, embed_batched)
+        except Exception as e:
+            logger.warning("Batched query embedding failed: %s", e)
+            query_embedding = None
         
-        # Filter by price range if specified
-        if query.price_range:
-            min_price, max_price = query.price_range
-            results = [
-                r for r in results 
-                if min_price <= r["product"].price <= max_price
-            ]
+        cache_bucket = (
+            brand_id, vector_store.catalog_version, query.limit, query.category,
+            tuple(query.price_range) if query.price_range else None
+        )
+        if query_embedding is not None and not no_cache:
+            cached = _search_response_cache.lookup(query_embedding, cache_bucket)
+            if cached is not None:
+                return {"query": query.query, "brand_id": brand_id, "results": cached}
         
-        return {
-            "query": query.query,
-            "brand_id": brand_id,
-            "results": [
-                {
-                    "product": result["product"],
-                    "similarity_score": result["similarity_score"]
-                }
-                for result in results
-            ]
-        }
+        results = await asyncio.to_thread(
+            vector_store.search_products,
+            query.query,
+            query.limit,
+            query_embedding,
+            category=query.category,
+            price_range=query.price_range
+        )
+        
+        payload = [
+            {
+                "product": result["product"],
+                "similarity_score": result["similarity_score"]
+            }
+            for result in results
+        ]
+        if query_embedding is not None and not no_cache:
+            _search_response_cache.store(query_embedding, cache_bucket, payload)
+        
+        return {"query": query.query, "brand_id": brand_id, "results": payload}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching products: {str(e)}")
 
@@ -582,17 +730,35 @@ async def get_brand_recommendations(brand_id: str, query: str, limit: int = 5):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
 
+@app.post("/brands/{brand_id}/recommendations/warm")
+async def warm_brand_recommendations(brand_id: str, request: ReasoningWarmupRequest, background_tasks: BackgroundTasks):
+    """Precompute recommendation reasoning for common queries via the OpenAI Batch API.
+
+    Returns immediately; results land in the reasoning cache when the batch completes (up to 24h).
+    """
+    chatbot_service = brand_service.get_chatbot_instance(brand_id)
+    if not chatbot_service:
+        raise HTTPException(status_code=404, detail=f"Brand '{brand_id}' not found or inactive")
+    
+    background_tasks.add_task(submit_reasoning_batch, chatbot_service, request.queries, request.limit)
+    return {
+        "message": f"Scheduled reasoning warm-up for {len(request.queries)} queries",
+        "brand_id": brand_id
+    }
+
 @app.get("/brands/{brand_id}/categories")
-async def get_brand_categories(brand_id: str):
+async def get_brand_categories(brand_id: str, request: Request, response: Response):
     """Get all available product categories for a specific brand"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        products = vector_store.get_all_products()
-        categories = list(set(product.category for product in products))
-        return {"categories": sorted(categories), "brand_id": brand_id}
+        vector_store = await _get_vector_store(brand_id)
+        counts = await asyncio.to_thread(vector_store.get_catalog_counts)
+        not_modified = _not_modified(request, response, _catalog_etag(brand_id, vector_store.catalog_version, counts.loaded_at))
+        if not_modified:
+            return not_modified
+        return {"categories": sorted(counts.categories), "brand_id": brand_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving categories: {str(e)}")
 
@@ -608,23 +774,20 @@ async def get_recommendations(query: str, limit: int = 5):
     return await get_brand_recommendations("techpro", query, limit)
 
 @app.get("/categories")
-async def get_categories():
+async def get_categories(request: Request, response: Response):
     """Get all available product categories (legacy endpoint)"""
-    return await get_brand_categories("techpro")
+    return await get_brand_categories("techpro", request, response)
 
 # Utility Endpoints
 @app.post("/brands/{brand_id}/products/bulk")
 async def add_brand_products_bulk(brand_id: str, products: List[Product]):
     """Add multiple products in bulk to a specific brand"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        vector_store = VectorStore(brand_id=brand_id)
-        success_count = 0
-        for product in products:
-            if vector_store.add_product(product):
-                success_count += 1
+        vector_store = await _get_vector_store(brand_id)
+        success_count = sum(await asyncio.to_thread(vector_store.add_products, products))
         
         return {
             "message": f"Successfully added {success_count}/{len(products)} products to {brand_id}",
@@ -649,7 +812,7 @@ async def get_global_stats():
         }
         
         for brand in active_brands:
-            brand_stats = brand_service.get_brand_stats(brand.id)
+            brand_stats = await asyncio.to_thread(brand_service.get_brand_stats, brand.id)
             if brand_stats:
                 total_stats["total_products"] += brand_stats["total_products"]
                 total_stats["total_conversations"] += brand_stats["active_conversations"]
@@ -664,7 +827,7 @@ async def get_global_stats():
 async def upload_product_file_to_brand(brand_id: str, file: UploadFile = File(...)):
     """Upload a file containing product data to a specific brand"""
     try:
-        if not brand_service.get_brand(brand_id):
+        if not brand_service.exists(brand_id):
             raise HTTPException(status_code=404, detail="Brand not found")
         
         # Validate file type
@@ -679,36 +842,48 @@ async def upload_product_file_to_brand(brand_id: str, file: UploadFile = File(..
         upload_id = str(uuid.uuid4())
         file_path = os.path.join(UPLOAD_DIR, f"{upload_id}_{file.filename}")
         
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Stream to disk in fixed-size chunks so memory use doesn't grow with the file;
+        # oversized uploads are aborted mid-stream and the partial file removed
+        file_size = 0
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > settings.MAX_UPLOAD_SIZE:
+                    break
+                await out.write(chunk)
+        if file_size > settings.MAX_UPLOAD_SIZE:
+            os.remove(file_path)
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum upload size is {settings.MAX_UPLOAD_SIZE} bytes"
+            )
         
         # Parse and add products based on file type
         products_added = 0
         file_extension = file.filename.lower().split('.')[-1]
         
         if file_extension == 'json':
-            products_added = await _process_json_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_json_file, file_path, brand_id)
         elif file_extension == 'csv':
-            products_added = await _process_csv_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_csv_file, file_path, brand_id)
         elif file_extension == 'pdf':
-            products_added = await _process_pdf_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_pdf_file, file_path, brand_id)
         elif file_extension in ['txt', 'md']:
-            products_added = await _process_text_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_text_file, file_path, brand_id)
         elif file_extension == 'docx':
-            products_added = await _process_docx_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_docx_file, file_path, brand_id)
         elif file_extension == 'xml':
-            products_added = await _process_xml_file(file_path, brand_id)
+            products_added = await asyncio.to_thread(_process_xml_file, file_path, brand_id)
         
         # Track uploaded file
         file_upload = FileUpload(
             filename=file.filename,
             upload_time=datetime.now(),
-            file_size=len(content),
+            file_size=file_size,
             products_added=products_added,
             status="success" if products_added > 0 else "failed"
         )
-        uploaded_files.append(file_upload)
+        await upload_store.record(upload_id, file_upload)
         
         return FileUploadResponse(
             message=f"Successfully uploaded {file.filename} and added {products_added} products to {brand_id}",
@@ -717,40 +892,216 @@ async def upload_product_file_to_brand(brand_id: str, file: UploadFile = File(..
             upload_id=upload_id
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
 
 # Modified file processing functions to accept brand_id
-async def _process_json_file(file_path: str, brand_id: str = "techpro") -> int:
-    """Process a JSON file containing product data"""
+# These parse and ingest synchronously; the upload endpoint runs them in a worker thread
+_product_list_adapter = TypeAdapter(List[Product])
+
+def _validate_products(records: List[Dict], file_path: str) -> List[Product]:
+    """Validate product records in one call, falling back to one at a time to skip invalid ones"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        vector_store = VectorStore(brand_id=brand_id)
+        return _product_list_adapter.validate_python(records)
+    except ValidationError:
+        products = []
+        for index, record in enumerate(records):
+            try:
+                products.append(Product.model_validate(record))
+            except ValidationError as e:
+                logger.warning("Skipping invalid product %s in %s: %s", index + 1, file_path, e)
+        return products
+
+# Products validated before they are handed to the vector store, so memory stays flat for big
+# feeds; a multiple of the vector store's embedding batch size so no chunk ends in a small batch
+INGEST_CHUNK_SIZE = 512
+
+def _read_json_file(file_path: str):
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _is_json_array(file_path: str) -> bool:
+    with open(file_path, 'rb') as f:
+        head = f.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')
+    return head[:1] == b'['
+
+def _process_json_file(file_path: str, brand_id: str = "techpro") -> int:
+    """Process a JSON file containing one product or an array of products.
+
+    With ijson installed, arrays are parsed incrementally and ingested in
+    chunks so large exports aren't held in memory; otherwise, and for a
+    single object, the file is parsed in one go.
+    """
+    try:
+        vector_store = brand_service.get_vector_store(brand_id)
         products_added = 0
         
+        if ijson and _is_json_array(file_path):
+            records = []
+            with open(file_path, 'rb') as f:
+                for record in ijson.items(f, 'item', use_float=True):
+                    records.append(record)
+                    if len(records) >= INGEST_CHUNK_SIZE:
+                        products_added += sum(vector_store.add_products(_validate_products(records, file_path)))
+                        records = []
+            if records:
+                products_added += sum(vector_store.add_products(_validate_products(records, file_path)))
+            return products_added
+        
+        data = _read_json_file(file_path)
+        
         # Handle both single product and array of products
-        if isinstance(data, list):
-            for product_data in data:
+        items = data if isinstance(data, list) else [data] if isinstance(data, dict) else []
+        products = _validate_products(items, file_path)
+        
+        if products:
+            products_added = sum(vector_store.add_products(products))
+        
+        return products_added
+        
+    except Exception:
+        logger.exception("Error processing JSON file %s", file_path)
+        return 0
+
+def _parse_csv_features(value: str) -> List[str]:
+    """Features as a JSON list or a comma/pipe separated string"""
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith('['):
+        return [str(item) for item in json.loads(value)]
+    separator = '|' if '|' in value else ','
+    return [item.strip() for item in value.split(separator) if item.strip()]
+
+def _parse_csv_specifications(value: str) -> Dict:
+    value = value.strip()
+    return json.loads(value) if value else {}
+
+def _parse_csv_bool(value: str) -> bool:
+    return value.strip().lower() not in ('false', '0', 'no', 'n')
+
+def _csv_row_to_record(row: Dict[str, str], default_id: str) -> Dict:
+    record = {key.strip(): (value or '') for key, value in row.items() if key}
+    record['id'] = record.get('id') or default_id
+    record['features'] = _parse_csv_features(record.get('features', ''))
+    record['specifications'] = _parse_csv_specifications(record.get('specifications', ''))
+    if 'availability' in record:
+        record['availability'] = _parse_csv_bool(record['availability'])
+    return record
+
+def _process_csv_file(file_path: str, brand_id: str = "techpro") -> int:
+    """Process a CSV file with one product per row.
+
+    Expected columns: id, name, description, category, price, features,
+    specifications (JSON object) and optionally availability.
+    """
+    try:
+        records = []
+        skipped = 0
+        # Rows without an id get one from a single per-file random prefix
+        id_prefix = uuid.uuid4().hex[:12]
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            for index, row in enumerate(csv.DictReader(f)):
                 try:
-                    product = Product(**product_data)
-                    if vector_store.add_product(product):
-                        products_added += 1
-                except Exception as e:
-                    print(f"Error adding product: {e}")
-        elif isinstance(data, dict):
+                    records.append(_csv_row_to_record(row, f"{id_prefix}-{index}"))
+                except (ValueError, TypeError) as e:
+                    skipped += 1
+                    logger.warning("Error parsing CSV row %s in %s: %s", index + 2, file_path, e)
+        if skipped:
+            logger.warning("Skipped %s unparseable rows in %s", skipped, file_path)
+        
+        products = _validate_products(records, file_path)
+        if not products:
+            return 0
+        
+        vector_store = brand_service.get_vector_store(brand_id)
+        return sum(vector_store.add_products(products))
+        
+    except Exception:
+        logger.exception("Error processing CSV file %s", file_path)
+        return 0
+
+# Element names accepted for each product field in XML uploads
+_XML_PRODUCT_TAGS = frozenset({'product', 'item'})
+_XML_FIELD_TAGS = {
+    'id': ('id', 'product_id', 'sku'),
+    'name': ('name', 'title', 'product_name'),
+    'description': ('description', 'desc', 'summary'),
+    'category': ('category', 'type'),
+    'price': ('price', 'cost'),
+    'availability': ('availability', 'available', 'in_stock'),
+}
+
+def _xml_element_to_product(elem, default_id: str) -> Product:
+    # Index direct children once instead of searching the element per candidate name
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag.lower(), child)
+    
+    record = {}
+    for field, tags in _XML_FIELD_TAGS.items():
+        for tag in tags:
+            child = children.get(tag)
+            if child is not None and child.text and child.text.strip():
+                record[field] = child.text.strip()
+                break
+    record['id'] = record.get('id') or default_id
+    if 'availability' in record:
+        record['availability'] = _parse_csv_bool(record['availability'])
+    
+    features = children.get('features')
+    record['features'] = [f.text.strip() for f in features if f.text and f.text.strip()] if features is not None else []
+    
+    specs = children.get('specifications')
+    record['specifications'] = {
+        spec.get('name') or spec.tag: (spec.text or '').strip() for spec in specs
+    } if specs is not None else {}
+    
+    return Product.model_validate(record)
+
+def _process_xml_file(file_path: str, brand_id: str = "techpro") -> int:
+    """Process an XML file with one <product> (or <item>) element per product.
+
+    The document is parsed incrementally and each product element is cleared
+    once read, so large feeds aren't held in memory.
+    """
+    try:
+        vector_store = brand_service.get_vector_store(brand_id)
+        products_added = 0
+        products = []
+        # Depth of open product elements, so an <item> nested inside a product isn't read as one
+        depth = 0
+        # Elements without an id get one from a single per-file random prefix
+        id_prefix = uuid.uuid4().hex[:12]
+        index = 0
+        for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+            if elem.tag.lower() not in _XML_PRODUCT_TAGS:
+                continue
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth:
+                continue
+            index += 1
             try:
-                product = Product(**data)
-                if vector_store.add_product(product):
-                    products_added += 1
-            except Exception as e:
-                print(f"Error adding product: {e}")
+                products.append(_xml_element_to_product(elem, f"{id_prefix}-{index}"))
+            except (ValueError, TypeError) as e:
+                logger.warning("Skipping invalid product element in %s: %s", file_path, e)
+            elem.clear()
+            if len(products) >= INGEST_CHUNK_SIZE:
+                products_added += sum(vector_store.add_products(products))
+                products = []
         
+        if products:
+            products_added += sum(vector_store.add_products(products))
         return products_added
         
-    except Exception as e:
-        print(f"Error processing JSON file: {e}")
+    except Exception:
+        logger.exception("Error processing XML file %s", file_path)
         return 0
 
 # ... (other file processing functions would be updated similarly)
@@ -758,23 +1109,38 @@ async def _process_json_file(file_path: str, brand_id: str = "techpro") -> int:
 # They follow the same pattern of accepting brand_id parameter
 
 @app.get("/uploads", response_model=List[FileUpload])
-async def get_uploaded_files():
-    """Get list of all uploaded files"""
-    return uploaded_files
+async def get_uploaded_files(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """Get list of uploaded files, oldest first; pass limit/offset to page through them"""
+    return await upload_store.list_uploads(limit, offset)
 
 @app.get("/uploads/{filename}")
 async def get_upload_details(filename: str):
     """Get details of a specific uploaded file"""
-    for upload in uploaded_files:
-        if upload.filename == filename:
-            return upload
-    raise HTTPException(status_code=404, detail="File not found")
+    upload = await upload_store.get(filename)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return upload
 
 if __name__ == "__main__":
+    # DEV=1 runs a single auto-reloading process; otherwise run WEB_CONCURRENCY workers
+    # ("auto" for one per CPU). uvicorn ignores workers when reload is on, so the two
+    # modes are exclusive.
+    dev_mode = os.getenv("DEV") == "1"
+    web_concurrency = os.getenv("WEB_CONCURRENCY", "1")
+    if web_concurrency == "auto":
+        web_concurrency = os.cpu_count() or 1
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=dev_mode,
+        workers=1 if dev_mode else int(web_concurrency),
+        # uvloop/httptools come with uvicorn[standard]; per-request access lines only in dev
+        loop="uvloop",
+        http="httptools",
+        access_log=dev_mode,
         log_level="info"
     )
\ No newline at end of file
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 class Product(BaseModel):
+    # Products are shared through the catalog snapshot, so they are immutable
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     name: str
     description: str
@@ -14,17 +17,24 @@ class Product(BaseModel):
     brand_id: Optional[str] = None
 
 class ChatMessage(BaseModel):
+    # Messages are never edited after they are recorded
+    model_config = ConfigDict(frozen=True)
+    
     role: str  
     content: str
     timestamp: Optional[datetime] = None
 
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     message: str
     conversation_id: Optional[str] = None
     user_id: Optional[str] = None
     voice: Optional[bool] = False  
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     response: str
     conversation_id: str
     suggested_products: Optional[List[Product]] = None
@@ -35,6 +45,14 @@ class ProductQuery(BaseModel):
     category: Optional[str] = None
     price_range: Optional[tuple[float, float]] = None
     limit: int = 5
+    
+    @field_validator("price_range")
+    @classmethod
+    def _order_price_range(cls, value: Optional[tuple[float, float]]) -> Optional[tuple[float, float]]:
+        # A reversed range would make Chroma's $gte/$lte filter match nothing
+        if value is not None and value[0] > value[1]:
+            return (value[1], value[0])
+        return value
 
 class ProductRecommendation(BaseModel):
     products: List[Product]
@@ -43,6 +61,8 @@ class ProductRecommendation(BaseModel):
 
 # New models for file upload functionality
 class FileUpload(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     filename: str
     upload_time: datetime
     file_size: int
@@ -103,4 +123,9 @@ class BrandConfigUpdateRequest(BaseModel):
     persona_prompt: Optional[str] = None
     welcome_message: Optional[str] = None
     company_info: Optional[Dict[str, Any]] = None
-    appearance_settings: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    appearance_settings: Optional[Dict[str, Any]] = None
+
+# Offline reasoning warm-up request
+class ReasoningWarmupRequest(BaseModel):
+    queries: List[str]
+    limit: int = 5
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+
+class OpenAIBatcher:
+    """Collect concurrent chat completion requests and dispatch them together.
+
+    Requests submitted within ``max_wait_ms`` of each other (up to
+    ``max_batch``) are sent as one burst through ``create_fn``, which is
+    expected to apply the shared concurrency limit. The worker task is
+    started on first use so it binds to the running event loop.
+    """
+
+    def __init__(
+        self,
+        create_fn: Callable[..., Awaitable[Any]],
+        max_batch: int = 16,
+        max_wait_ms: float = 20
+    ):
+        self._create = create_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def submit(self, **kwargs) -> Any:
+        """Queue a completion request and wait for its response"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((kwargs, future))
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[dict, asyncio.Future]]):
+        results = await asyncio.gather(
+            *(self._create(**kwargs) for kwargs, _ in batch),
+            return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller gave up (e.g. its request was cancelled)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """Stop the worker; requests already dispatched are left to finish"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
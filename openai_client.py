@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from config import settings
+
+# Outbound OpenAI limits, shared by every chatbot instance
+OPENAI_TIMEOUT_SECONDS = 30
+OPENAI_CONNECT_TIMEOUT_SECONDS = 5
+OPENAI_MAX_RETRIES = 2
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 50
+
+# Limit on concurrent OpenAI requests across the process
+OPENAI_MAX_CONCURRENCY = 8
+
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+# Created on first use so it binds to the running event loop
+_openai_semaphore: Optional[asyncio.Semaphore] = None
+
+# Sync client for code running in worker threads (vector store ingestion)
+_sync_http_client: Optional[httpx.Client] = None
+_sync_openai_client: Optional[OpenAI] = None
+_sync_client_lock = threading.Lock()
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client.
+
+    All callers share one HTTP/2 connection pool, so concurrent requests are
+    multiplexed over warm connections instead of each paying for a new TLS
+    handshake.
+    """
+    global _http_client, _openai_client
+    if _openai_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+        )
+        _openai_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=_http_client
+        )
+    return _openai_client
+
+
+def get_openai_client() -> OpenAI:
+    """Return the process-wide synchronous OpenAI client, with its own pooled connections"""
+    global _sync_http_client, _sync_openai_client
+    if _sync_openai_client is None:
+        with _sync_client_lock:
+            if _sync_openai_client is None:
+                _sync_http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                    ),
+                    timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+                )
+                _sync_openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    http_client=_sync_http_client
+                )
+    return _sync_openai_client
+
+
+def get_openai_semaphore() -> asyncio.Semaphore:
+    """Semaphore every OpenAI request should hold, bounding concurrent calls"""
+    global _openai_semaphore
+    if _openai_semaphore is None:
+        _openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return _openai_semaphore
+
+
+async def close_async_openai_client():
+    """Close the shared connection pools (call on application shutdown)"""
+    global _http_client, _openai_client, _sync_http_client, _sync_openai_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _openai_client = None
+    
+    if _sync_http_client is not None:
+        _sync_http_client.close()
+    _sync_http_client = None
+    _sync_openai_client = None
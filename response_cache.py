@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+class _Bucket:
+    """Embeddings and responses for one cache bucket, oldest first"""
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.responses: List[Any] = [None] * capacity
+        self.expiries = np.zeros(capacity, dtype=np.float64)
+        self.next_slot = 0
+        self.size = 0
+
+
+class SemanticResponseCache:
+    """Cache of responses looked up by cosine similarity of the prompt embedding.
+
+    Entries are grouped into buckets (e.g. voice vs. text, product vs. general
+    questions) so responses never cross between request types. Each bucket is
+    a fixed-size ring buffer; the oldest entry is overwritten when it is full.
+    """
+
+    def __init__(
+        self,
+        dim: int = 1536,
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        max_entries_per_bucket: int = 512,
+        max_buckets: int = 16
+    ):
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries_per_bucket = max_entries_per_bucket
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Hashable, _Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def lookup(self, embedding: List[float], bucket_key: Hashable) -> Optional[Any]:
+        """Return the cached response for the most similar live prompt, if similar enough"""
+        vector = self._normalize(embedding)
+        if vector is None or len(vector) != self.dim:
+            return None
+
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None or bucket.size == 0:
+                return None
+
+            similarities = bucket.vectors[:bucket.size] @ vector
+            similarities[bucket.expiries[:bucket.size] < time.monotonic()] = -1.0
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return bucket.responses[best]
+
+    def store(self, embedding: List[float], bucket_key: Hashable, response: Any):
+        """Remember a response for a prompt embedding"""
+        vector = self._normalize(embedding)
+        if vector is None or len(vector) != self.dim:
+            return
+
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = _Bucket(self.dim, self.max_entries_per_bucket)
+                self._buckets[bucket_key] = bucket
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(bucket_key)
+
+            slot = bucket.next_slot
+            bucket.vectors[slot] = vector
+            bucket.responses[slot] = response
+            bucket.expiries[slot] = time.monotonic() + self.ttl
+            bucket.next_slot = (slot + 1) % self.max_entries_per_bucket
+            bucket.size = min(bucket.size + 1, self.max_entries_per_bucket)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "entries": sum(bucket.size for bucket in self._buckets.values())
+            }
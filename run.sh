@@ -13,4 +13,4 @@ echo "📋 Python version: $(python --version)"
 
 # Start the server
 echo "🌟 Starting FastAPI server..."
-python main.py 
\ No newline at end of file
+DEV=${DEV:-1} python main.py 
\ No newline at end of file
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Settings are read at import time and require an API key; tests never call OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
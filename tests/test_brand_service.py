@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from brand_service import BrandService
+
+
+@pytest.fixture
+def brand_service(tmp_path, monkeypatch):
+    # Brand files are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    service = BrandService()
+    service.flush()
+    yield service
+    service.flush()
+
+
+def _read_config(brand_id: str) -> dict:
+    with open(f"brands/{brand_id}.json") as f:
+        return json.load(f)
+
+
+def test_changes_are_debounced_into_one_flush(brand_service):
+    brand_service.update_brand_config("techpro", system_prompt="first")
+    timer = brand_service._flush_timer
+    assert timer is not None
+    brand_service.update_brand_config("techpro", welcome_message="hi")
+    assert brand_service._flush_timer is timer
+
+    brand_service.flush()
+    assert brand_service._flush_timer is None
+    config = _read_config("techpro")
+    assert config["system_prompt"] == "first"
+    assert config["welcome_message"] == "hi"
+
+
+def test_failed_write_is_retried(brand_service, monkeypatch):
+    brand_service.update_brand_config("techpro", system_prompt="persist me")
+
+    def fail(path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(brand_service, "_write_json_atomic", fail)
+    brand_service.flush()
+    assert "techpro" in brand_service._dirty_configs
+    assert brand_service._flush_timer is not None
+
+    monkeypatch.delattr(brand_service, "_write_json_atomic")
+    brand_service.flush()
+    assert not brand_service._dirty_configs
+    assert _read_config("techpro")["system_prompt"] == "persist me"
+
+
+def test_new_ids_take_the_smallest_free_suffix(brand_service):
+    assert brand_service.create_brand("Acme", "d", brand_id="acme-3").id == "acme-3"
+    ids = [brand_service.create_brand("Acme", "d").id for _ in range(4)]
+    assert ids == ["acme", "acme-1", "acme-2", "acme-4"]
+
+
+def test_missing_config_is_remembered_but_read_errors_are_not(brand_service, monkeypatch):
+    brand = brand_service.create_brand("Other", "d")
+    brand_service.flush()
+    brand_service.brand_configs.pop(brand.id)
+
+    def broken(path):
+        raise OSError("I/O error")
+
+    monkeypatch.setattr(brand_service, "_read_json", broken)
+    assert brand_service.get_brand_config(brand.id) is None
+    assert brand.id not in brand_service._missing_configs
+
+    monkeypatch.delattr(brand_service, "_read_json")
+    assert brand_service.get_brand_config(brand.id).brand_id == brand.id
+
+    brand_service.brand_configs.pop(brand.id)
+    brand_service._config_dumps.pop(brand.id)
+    os.remove(f"brands/{brand.id}.json")
+    assert brand_service.get_brand_config(brand.id) is None
+    assert brand.id in brand_service._missing_configs
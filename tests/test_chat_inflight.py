@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from chatbot_service import ChatbotService
+from models import ChatRequest, ChatResponse
+
+
+def _chatbot(turn):
+    # The turn itself is replaced, so the vector store is never touched
+    chatbot = ChatbotService(brand_id="test", vector_store=object())
+    chatbot._chat_turn = turn
+    return chatbot
+
+
+def test_concurrent_duplicate_turns_share_one_answer():
+    calls = []
+
+    async def turn(request, use_cache=True):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return ChatResponse(response="answer", conversation_id=request.conversation_id)
+
+    async def run():
+        chatbot = _chatbot(turn)
+        request = ChatRequest(message="hello there", conversation_id="c1")
+        return await asyncio.gather(chatbot.chat(request), chatbot.chat(request))
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first is second
+
+
+def test_duplicates_take_over_when_first_turn_is_cancelled():
+    calls = []
+
+    async def run():
+        started = asyncio.Event()
+
+        async def turn(request, use_cache=True):
+            calls.append(request)
+            if len(calls) == 1:
+                started.set()
+                await asyncio.Event().wait()  # the disconnected client's turn never finishes
+            await asyncio.sleep(0.01)
+            return ChatResponse(response="retried", conversation_id=request.conversation_id)
+
+        chatbot = _chatbot(turn)
+        request = ChatRequest(message="hello there", conversation_id="c1")
+        first = asyncio.create_task(chatbot.chat(request))
+        await started.wait()
+        retries = [asyncio.create_task(chatbot.chat(request)) for _ in range(2)]
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.gather(*retries)
+
+    results = asyncio.run(run())
+    assert [r.response for r in results] == ["retried", "retried"]
+    # One of the waiters answered the turn; the other shared its response
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_turn():
+    async def run():
+        async def turn(request, use_cache=True):
+            await asyncio.sleep(0.01)
+            return ChatResponse(response="answer", conversation_id=request.conversation_id)
+
+        chatbot = _chatbot(turn)
+        request = ChatRequest(message="hello there", conversation_id="c1")
+        first = asyncio.create_task(chatbot.chat(request))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(chatbot.chat(request))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await first
+
+    assert asyncio.run(run()).response == "answer"
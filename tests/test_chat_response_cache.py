@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from chatbot_service import ChatbotService
+from models import ChatRequest
+
+EMBEDDING = [1.0] + [0.0] * 1535
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    chatbot = ChatbotService(brand_id="test", vector_store=SimpleNamespace(catalog_version=0))
+    generated = []
+
+    async def embed_query(text):
+        # Every opener embeds identically, so any cached reply would match
+        return EMBEDDING
+
+    async def classify(message, conversation, query_embedding=None):
+        return False, []
+
+    async def generate(conversation_id, product_context, message, is_product_request, is_voice=False):
+        generated.append(message)
+        return f"reply to {message}"
+
+    monkeypatch.setattr(chatbot, "_embed_query", embed_query)
+    monkeypatch.setattr(chatbot, "_classify_with_speculative_search", classify)
+    monkeypatch.setattr(chatbot, "_generate_response", generate)
+    chatbot.generated = generated
+    return chatbot
+
+
+def _chat(chatbot, message):
+    return asyncio.run(chatbot.chat(ChatRequest(message=message)))
+
+
+def test_plain_opener_is_cached(chatbot):
+    _chat(chatbot, "Do you sell laptops here?")
+    response = _chat(chatbot, "Do you sell laptops here??")
+    assert response.response == "reply to Do you sell laptops here?"
+    assert chatbot.generated == ["Do you sell laptops here?"]
+
+
+def test_pii_opener_is_not_stored(chatbot):
+    _chat(chatbot, "Hi, I'm Budi, order 12345678 hasn't arrived")
+    assert chatbot._response_cache.stats()["entries"] == 0
+
+    response = _chat(chatbot, "Do you sell laptops here?")
+    assert "12345678" not in response.response
+
+
+def test_pii_opener_is_not_served_from_cache(chatbot):
+    _chat(chatbot, "Do you sell laptops here?")
+    response = _chat(chatbot, "My email is budi@example.com, any laptops?")
+    assert response.response == "reply to My email is budi@example.com, any laptops?"
+    assert len(chatbot.generated) == 2
@@ -0,0 +1,33 @@
+import numpy as np
+
+from embedding_cache import DocumentEmbeddingCache
+
+
+def _embed(texts):
+    return [[float(len(text)), 0.5] for text in texts]
+
+
+def test_embed_many_embeds_each_miss_once_and_keeps_float32_in_memory(tmp_path):
+    cache = DocumentEmbeddingCache(path=str(tmp_path / "embeddings.db"))
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return _embed(texts)
+
+    assert cache.embed_many(["a", "bb", "a"], embed) == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert cache.embed_many(["a", "ccc"], embed) == [[1.0, 0.5], [3.0, 0.5]]
+    assert calls == [["a", "bb"], ["ccc"]]
+
+    stored = cache._memory.get(cache._key("a"))
+    assert isinstance(stored, np.ndarray) and stored.dtype == np.float32
+
+
+def test_embeddings_survive_a_new_cache_instance(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    DocumentEmbeddingCache(path=path).embed_many(["bb"], _embed)
+
+    def fail(texts):
+        raise AssertionError("should be served from disk")
+
+    assert DocumentEmbeddingCache(path=path).embed_many(["bb"], fail) == [[2.0, 0.5]]
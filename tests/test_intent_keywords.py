@@ -0,0 +1,32 @@
+import pytest
+
+from chatbot_service import _STRONG_INTENT_RE, _WEAK_INTENT_RE
+
+
+@pytest.mark.parametrize("message", [
+    "I believe I was double-charged on my order",
+    "Thanks for caring",
+    "My costume order is late",
+    "My hphone screen is cracked",
+    "Where is my refund?",
+])
+def test_strong_keywords_do_not_match_inside_words(message):
+    assert not _STRONG_INTENT_RE.search(message)
+
+
+@pytest.mark.parametrize("message", [
+    "Can you recommend a laptop?",
+    "What are the features of this monitor?",
+    "Show me the specifications",
+    "I'm buying a new keyboard",
+    "Tolong bandingkan dua laptop ini",
+    "Berapa harga iPhone 15?",
+    "Saya mau beli HP baru",
+])
+def test_strong_keywords_match_whole_words(message):
+    assert _STRONG_INTENT_RE.search(message)
+
+
+def test_weak_keywords_match_whole_words_only():
+    assert _WEAK_INTENT_RE.search("Which one is better?")
+    assert not _WEAK_INTENT_RE.search("Apartment delivery options")
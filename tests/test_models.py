@@ -0,0 +1,13 @@
+from models import ProductQuery
+
+
+def test_price_range_in_order_is_kept():
+    assert ProductQuery(query="laptop", price_range=(100, 500)).price_range == (100, 500)
+
+
+def test_reversed_price_range_is_swapped():
+    assert ProductQuery(query="laptop", price_range=(500, 100)).price_range == (100, 500)
+
+
+def test_price_range_is_optional():
+    assert ProductQuery(query="laptop").price_range is None
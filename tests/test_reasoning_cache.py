@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import chatbot_service
+from chatbot_service import ChatbotService
+from models import Product
+
+LAPTOP = Product(
+    id="p1",
+    name="Laptop",
+    description="A light laptop",
+    category="laptops",
+    price=999.0,
+    features=["16GB RAM"],
+    specifications={"weight": "1.2kg"},
+)
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    chatbot = ChatbotService(brand_id="test", vector_store=SimpleNamespace(catalog_version=0))
+    chatbot.products = [LAPTOP]
+    generated = []
+
+    async def search(query, limit, query_embedding=None):
+        return [{"product": product, "similarity_score": 0.9} for product in chatbot.products]
+
+    async def generate(query, product_info):
+        generated.append(query)
+        return f"reasoning {len(generated)}"
+
+    monkeypatch.setattr(chatbot, "_search_products", search)
+    monkeypatch.setattr(chatbot, "_generate_recommendation_reasoning", generate)
+    chatbot.generated = generated
+    return chatbot
+
+
+def _recommend(chatbot, query="light laptop"):
+    return asyncio.run(chatbot.get_product_recommendations(query)).reasoning
+
+
+def test_reasoning_is_reused_for_same_products(chatbot):
+    assert _recommend(chatbot) == "reasoning 1"
+    assert _recommend(chatbot, "Light  Laptop") == "reasoning 1"
+    assert chatbot.generated == ["light laptop"]
+
+
+def test_product_change_misses_reasoning_cache(chatbot):
+    _recommend(chatbot)
+    chatbot.products = [LAPTOP.model_copy(update={"price": 799.0})]
+    assert _recommend(chatbot) == "reasoning 2"
+
+
+def test_catalog_write_misses_reasoning_cache(chatbot):
+    _recommend(chatbot)
+    chatbot.vector_store.catalog_version += 1
+    assert _recommend(chatbot) == "reasoning 2"
+
+
+def test_reasoning_expires(chatbot, monkeypatch):
+    _recommend(chatbot)
+    monkeypatch.setattr(chatbot_service, "REASONING_CACHE_TTL_SECONDS", 0)
+    assert _recommend(chatbot) == "reasoning 2"
+
+
+def test_prepared_reasoning_is_served(chatbot):
+    cache_key, prompt = asyncio.run(chatbot.prepare_reasoning_request("light laptop"))
+    chatbot.store_reasoning(cache_key, "batched reasoning")
+    assert asyncio.run(chatbot.prepare_reasoning_request("light laptop")) is None
+    assert _recommend(chatbot) == "batched reasoning"
+    assert chatbot.generated == []
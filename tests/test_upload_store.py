@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from models import FileUpload
+from upload_store import UploadStore
+
+
+def _upload(filename: str, minutes: int) -> FileUpload:
+    return FileUpload(
+        filename=filename,
+        upload_time=datetime(2024, 1, 1) + timedelta(minutes=minutes),
+        file_size=10,
+        products_added=1,
+        status="success"
+    )
+
+
+def test_list_uploads_pages_oldest_first(tmp_path):
+    async def run():
+        store = UploadStore(db_path=str(tmp_path / "uploads.db"))
+        try:
+            for i in range(5):
+                await store.record(f"id-{i}", _upload(f"file{i}.csv", i))
+            everything = await store.list_uploads()
+            page = await store.list_uploads(limit=2, offset=1)
+            tail = await store.list_uploads(limit=10, offset=4)
+        finally:
+            await store.close()
+        return everything, page, tail
+
+    everything, page, tail = asyncio.run(run())
+    assert [u.filename for u in everything] == [f"file{i}.csv" for i in range(5)]
+    assert [u.filename for u in page] == ["file1.csv", "file2.csv"]
+    assert [u.filename for u in tail] == ["file4.csv"]
+
+
+def test_record_replaces_same_filename_and_trims(tmp_path):
+    async def run():
+        store = UploadStore(db_path=str(tmp_path / "uploads.db"), max_records=3)
+        try:
+            for i in range(5):
+                await store.record(f"id-{i}", _upload(f"file{i}.csv", i))
+            await store.record("id-again", _upload("file4.csv", 10))
+            return await store.list_uploads(), await store.get("file0.csv")
+        finally:
+            await store.close()
+
+    uploads, oldest = asyncio.run(run())
+    assert [u.filename for u in uploads] == ["file2.csv", "file3.csv", "file4.csv"]
+    assert oldest is None
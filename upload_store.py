@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import aiosqlite
+
+from config import settings
+from models import FileUpload
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_uploads (
+    filename TEXT PRIMARY KEY,
+    upload_id TEXT NOT NULL,
+    upload_time TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    products_added INTEGER NOT NULL,
+    status TEXT NOT NULL
+)
+"""
+
+_INDEX = "CREATE INDEX IF NOT EXISTS file_uploads_upload_time ON file_uploads (upload_time)"
+
+_COLUMNS = "filename, upload_time, file_size, products_added, status"
+
+# Upload records kept; the oldest are dropped beyond this
+MAX_UPLOAD_RECORDS = 10000
+
+
+class UploadStore:
+    """SQLite-backed upload history shared by all worker processes.
+
+    One row per filename; re-uploading a file replaces its row, and only the
+    most recent ``max_records`` uploads are kept. A single connection is
+    opened on first use and reused for the life of the process, in WAL mode
+    so other workers can read while one writes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_records: int = MAX_UPLOAD_RECORDS):
+        self.db_path = db_path or settings.UPLOADS_DB_PATH
+        self.max_records = max_records
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            if self._connect_lock is None:
+                self._connect_lock = asyncio.Lock()
+            async with self._connect_lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(self.db_path)
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute("PRAGMA synchronous=NORMAL")
+                    await conn.execute("PRAGMA busy_timeout=5000")
+                    await conn.execute(_SCHEMA)
+                    await conn.execute(_INDEX)
+                    await conn.commit()
+                    self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _from_row(row) -> FileUpload:
+        filename, upload_time, file_size, products_added, status = row
+        return FileUpload(
+            filename=filename,
+            upload_time=datetime.fromisoformat(upload_time),
+            file_size=file_size,
+            products_added=products_added,
+            status=status
+        )
+
+    async def record(self, upload_id: str, upload: FileUpload):
+        """Store an upload, replacing any earlier upload of the same filename"""
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT OR REPLACE INTO file_uploads (upload_id, " + _COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?)",
+            (upload_id, upload.filename, upload.upload_time.isoformat(), upload.file_size, upload.products_added, upload.status)
+        )
+        await conn.execute(
+            "DELETE FROM file_uploads WHERE upload_time < "
+            "(SELECT upload_time FROM file_uploads ORDER BY upload_time DESC LIMIT 1 OFFSET ?)",
+            (self.max_records - 1,)
+        )
+        await conn.commit()
+
+    async def list_uploads(self, limit: Optional[int] = None, offset: int = 0) -> List[FileUpload]:
+        """Uploads oldest first, optionally one page at a time"""
+        conn = await self._connection()
+        # LIMIT -1 means no limit in SQLite
+        async with conn.execute(
+            "SELECT " + _COLUMNS + " FROM file_uploads ORDER BY upload_time LIMIT ? OFFSET ?",
+            (limit if limit is not None else -1, offset)
+        ) as cursor:
+            return [self._from_row(row) for row in await cursor.fetchall()]
+
+    async def get(self, filename: str) -> Optional[FileUpload]:
+        conn = await self._connection()
+        async with conn.execute("SELECT " + _COLUMNS + " FROM file_uploads WHERE filename = ? LIMIT 1", (filename,)) as cursor:
+            row = await cursor.fetchone()
+        return self._from_row(row) if row else None
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
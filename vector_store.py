@@ -1,11 +1,91 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple
 import json
+import logging
+import threading
+import time
 import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import settings
+from openai_client import get_openai_client
 from models import Product
+from cache_utils import LRUCache
+from embedding_cache import embed_query_cached, get_document_embedding_cache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Stored product payloads are decoded on every search, so prefer orjson
+_json_loads = orjson.loads if orjson else json.loads
+
+# Products embedded per OpenAI request when adding in bulk. Product documents are a
+# few hundred tokens, so this stays well under the per-request input and token limits.
+EMBEDDING_BATCH_SIZE = 256
+
+# Catalog version per brand, bumped on every product change. Shared across
+# VectorStore instances so caches keyed on it see changes made through any of them.
+_catalog_versions: Dict[str, int] = {}
+
+
+class CatalogSnapshot(NamedTuple):
+    """All products of a brand plus aggregates derived from them"""
+    version: int
+    loaded_at: float
+    products: Tuple[Product, ...]
+    categories: Tuple[str, ...]
+    available_count: int
+
+
+# Snapshots are rebuilt when the catalog version changes, or after the TTL so
+# changes made by other worker processes show up too
+CATALOG_SNAPSHOT_TTL_SECONDS = 60
+_catalog_snapshots: Dict[str, CatalogSnapshot] = {}
+
+# Recent search results, keyed on the catalog version so product changes invalidate
+# them and expired after a TTL so changes made by other worker processes show up
+SEARCH_RESULT_CACHE_SIZE = 512
+SEARCH_RESULT_TTL_SECONDS = 60
+_search_results = LRUCache(maxsize=SEARCH_RESULT_CACHE_SIZE)
+
+
+class _InflightAdd:
+    """A product insert in progress that concurrent adds of the same id wait on"""
+    __slots__ = ("event", "success")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.success = False
+
+
+_inflight_adds: Dict[str, _InflightAdd] = {}
+_inflight_adds_lock = threading.Lock()
+
+# One rebuild per brand at a time; concurrent callers wait for it and share the result
+_snapshot_locks: Dict[str, threading.Lock] = {}
+
+
+@dataclass
+class CatalogCounts:
+    """Product totals for a brand, kept up to date on writes"""
+    loaded_at: float
+    categories: Counter
+    available: int
+
+    @property
+    def total(self) -> int:
+        return sum(self.categories.values())
+
+
+# Category and availability counts per brand, so categories and stats don't need
+# the full catalog. Reseeded from Chroma metadata after the snapshot TTL.
+_catalog_counts: Dict[str, CatalogCounts] = {}
 
 class VectorStore:
     def __init__(self, brand_id: Optional[str] = None):
@@ -20,7 +100,38 @@ class VectorStore:
             name=self.collection_name,
             metadata={"hnsw:space": "cosine", "brand_id": self.brand_id}
         )
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = get_openai_client()
+    
+    @property
+    def catalog_version(self) -> int:
+        """Monotonic version of this brand's catalog, for cache invalidation"""
+        return _catalog_versions.get(self.brand_id, 0)
+
+    def _bump_catalog_version(self):
+        _catalog_versions[self.brand_id] = _catalog_versions.get(self.brand_id, 0) + 1
+        _catalog_snapshots.pop(self.brand_id, None)
+
+    def _adjust_counts(self, added: List[Product] = (), removed: List[Dict[str, Any]] = ()):
+        """Apply added products and removed product metadata to the brand's counts"""
+        counts = _catalog_counts.get(self.brand_id)
+        if counts is None:
+            return
+        for product in added:
+            counts.categories[product.category] += 1
+            counts.available += product.availability
+        for metadata in removed:
+            category = metadata.get("category")
+            counts.categories[category] -= 1
+            if counts.categories[category] <= 0:
+                del counts.categories[category]
+            counts.available -= bool(metadata.get("availability"))
+
+    def _get_stored_metadata(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Metadata of the given stored ids that exist, needed only while counts are tracked"""
+        if not ids or self.brand_id not in _catalog_counts:
+            return {}
+        results = self.collection.get(ids=ids, include=["metadatas"])
+        return dict(zip(results['ids'], results['metadatas']))
     
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using OpenAI API"""
@@ -30,10 +141,17 @@ class VectorStore:
                 input=text
             )
             return response.data[0].embedding
-        except Exception as e:
-            print(f"Error generating embedding: {e}")
+        except Exception:
+            logger.exception("Error generating embedding")
             raise
 
+    def _embed_documents(self, documents: List[str]) -> List[List[float]]:
+        response = self.openai_client.embeddings.create(
+            model=settings.EMBEDDING_MODEL,
+            input=documents
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
     def prepare_product_text(self, product: Product) -> str:
         """Prepare product data for embedding"""
         features_text = ", ".join(product.features)
@@ -49,115 +167,319 @@ class VectorStore:
         Available: {product.availability}
         """.strip()
 
+    def _product_metadata(self, product: Product) -> Dict[str, Any]:
+        return {
+            "product_id": product.id,
+            "name": product.name,
+            "category": product.category,
+            "price": product.price,
+            "availability": product.availability,
+            "product_data": product.model_dump_json(),
+            "brand_id": self.brand_id
+        }
+
     def add_product(self, product: Product) -> bool:
         """Add a product to the vector store"""
+        return self.add_products([product])[0]
+
+    def add_products(self, products: List[Product]) -> List[bool]:
+        """Add products with one embedding request and one insert per batch.
+
+        Returns a success flag per product, in input order.
+        """
+        results = [False] * len(products)
+        for start in range(0, len(products), EMBEDDING_BATCH_SIZE):
+            batch = products[start:start + EMBEDDING_BATCH_SIZE]
+            ids = [f"{self.brand_id}_{product.id}" for product in batch]
+            
+            # Singleflight: a product already being added (by another request or
+            # earlier in this batch) is waited on instead of embedded again
+            owned: List[Tuple[str, Product]] = []
+            claimed: List[_InflightAdd] = []
+            waiting: List[Tuple[int, _InflightAdd]] = []
+            with _inflight_adds_lock:
+                for i, (stored_id, product) in enumerate(zip(ids, batch)):
+                    inflight = _inflight_adds.get(stored_id)
+                    if inflight is None:
+                        inflight = _inflight_adds[stored_id] = _InflightAdd()
+                        owned.append((stored_id, product))
+                        claimed.append(inflight)
+                    waiting.append((i, inflight))
+            
+            success = False
+            try:
+                success = bool(owned) and self._add_batch(owned)
+            finally:
+                with _inflight_adds_lock:
+                    for (stored_id, _), inflight in zip(owned, claimed):
+                        inflight.success = success
+                        del _inflight_adds[stored_id]
+                for inflight in claimed:
+                    inflight.event.set()
+            
+            for i, inflight in waiting:
+                inflight.event.wait()
+                results[start + i] = inflight.success
+        
+        if any(results):
+            self._bump_catalog_version()
+        return results
+
+    def _add_batch(self, items: List[Tuple[str, Product]]) -> bool:
+        """Embed and insert (stored_id, product) pairs with one request each"""
         try:
-            product_text = self.prepare_product_text(product)
-            embedding = self.generate_embedding(product_text)
+            ids = [stored_id for stored_id, _ in items]
+            batch = [product for _, product in items]
+            documents = [self.prepare_product_text(product) for product in batch]
+            # Only documents not embedded before cost an API call
+            embeddings = get_document_embedding_cache().embed_many(documents, self._embed_documents)
+            # Chroma skips ids that already exist, so only new products are counted
+            existing = self._get_stored_metadata(ids)
             
             self.collection.add(
-                embeddings=[embedding],
-                documents=[product_text],
-                metadatas=[{
-                    "product_id": product.id,
-                    "name": product.name,
-                    "category": product.category,
-                    "price": product.price,
-                    "availability": product.availability,
-                    "product_data": product.model_dump_json(),
-                    "brand_id": self.brand_id
-                }],
-                ids=[f"{self.brand_id}_{product.id}"]
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=[self._product_metadata(product) for product in batch],
+                ids=ids
+            )
+            self._adjust_counts(
+                added=[product for product, stored_id in zip(batch, ids) if stored_id not in existing]
             )
             return True
-        except Exception as e:
-            print(f"Error adding product to vector store: {e}")
+        except Exception:
+            logger.exception("Error adding products to vector store")
             return False
 
-    def search_products(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for products based on query"""
+    def warmup(self):
+        """Run one embedding and one query so the first real search doesn't pay for
+        loading the index or opening the OpenAI connection"""
+        try:
+            if self.collection.count() == 0:
+                return
+            self.search_products("warmup", limit=1)
+        except Exception:
+            logger.exception("Error warming up vector store for %s", self.brand_id)
+
+    def _build_where(
+        self,
+        category: Optional[str] = None,
+        price_range: Optional[Tuple[float, float]] = None
+    ) -> Dict[str, Any]:
+        """Metadata filter for this brand, optionally narrowed by category and price"""
+        conditions: List[Dict[str, Any]] = [{"brand_id": self.brand_id}]
+        if category:
+            conditions.append({"category": category})
+        if price_range:
+            min_price, max_price = price_range
+            conditions.append({"price": {"$gte": min_price}})
+            conditions.append({"price": {"$lte": max_price}})
+        # Chroma only accepts a single key per clause, so combine with $and
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def search_products(
+        self,
+        query: str,
+        limit: int = 5,
+        query_embedding: Optional[List[float]] = None,
+        category: Optional[str] = None,
+        price_range: Optional[Tuple[float, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for products based on query, optionally reusing an embedding of it.
+
+        Category and price range filters are applied by Chroma, so up to
+        ``limit`` matching products are returned. Repeated searches are served
+        from a short-lived cache without embedding or querying again.
+        """
+        cache_key = (
+            self.brand_id,
+            self.catalog_version,
+            normalize_query(query),
+            limit,
+            category,
+            tuple(price_range) if price_range else None
+        )
+        cached = _search_results.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < SEARCH_RESULT_TTL_SECONDS:
+            return list(cached[1])
+        
         try:
-            query_embedding = self.generate_embedding(query)
+            if query_embedding is None:
+                query_embedding = embed_query_cached(query, self.generate_embedding)
             
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=limit,
                 include=["metadatas", "documents", "distances"],
-                where={"brand_id": self.brand_id}
+                where=self._build_where(category, price_range)
             )
             
             products = []
             if results['metadatas'] and results['metadatas'][0]:
                 for i, metadata in enumerate(results['metadatas'][0]):
-                    product_data = json.loads(metadata['product_data'])
                     products.append({
-                        "product": Product(**product_data),
+                        "product": Product.model_validate(_json_loads(metadata['product_data'])),
                         "similarity_score": 1 - results['distances'][0][i],  # Convert distance to similarity
                         "context": results['documents'][0][i]
                     })
             
+            if products:
+                _search_results.set(cache_key, (time.monotonic(), tuple(products)))
             return products
-        except Exception as e:
-            print(f"Error searching products: {e}")
+        except Exception:
+            logger.exception("Error searching products")
             return []
 
-    def search_by_category(self, category: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search products by category"""
+    def search_by_category(
+        self,
+        category: str,
+        limit: int = 10,
+        price_range: Optional[Tuple[float, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search products by category, optionally within a price range"""
         try:
             results = self.collection.get(
-                where={"category": category, "brand_id": self.brand_id},
+                where=self._build_where(category, price_range),
                 limit=limit,
                 include=["metadatas", "documents"]
             )
             
             products = []
             for metadata in results['metadatas']:
-                product_data = json.loads(metadata['product_data'])
                 products.append({
-                    "product": Product(**product_data),
+                    "product": Product.model_validate(_json_loads(metadata['product_data'])),
                     "similarity_score": 1.0,  # Perfect match for category
                     "context": metadata
                 })
             
             return products
-        except Exception as e:
-            print(f"Error searching by category: {e}")
+        except Exception:
+            logger.exception("Error searching by category")
             return []
 
+    def _iter_all_products(self) -> Iterator[Product]:
+        results = self.collection.get(
+            where={"brand_id": self.brand_id},
+            include=["metadatas"]
+        )
+        for metadata in results['metadatas']:
+            product_data = _json_loads(metadata['product_data'])
+            product_data['brand_id'] = self.brand_id
+            yield Product.model_validate(product_data)
+
+    def _load_all_products(self) -> List[Product]:
+        return list(self._iter_all_products())
+
     def get_all_products(self) -> List[Product]:
         """Get all products from the vector store for this brand"""
         try:
-            results = self.collection.get(
-                where={"brand_id": self.brand_id},
-                include=["metadatas"]
-            )
-            products = []
-            for metadata in results['metadatas']:
-                product_data = json.loads(metadata['product_data'])
-                products.append(Product(**product_data))
-            return products
-        except Exception as e:
-            print(f"Error getting all products: {e}")
+            return self._load_all_products()
+        except Exception:
+            logger.exception("Error getting all products")
             return []
 
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """Get all products and their aggregates, reading Chroma only when the catalog changed.
+
+        The returned products are shared between callers and must not be modified.
+        """
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot
+        
+        with _snapshot_locks.setdefault(self.brand_id, threading.Lock()):
+            # Another thread may have rebuilt it while we waited
+            snapshot = self._fresh_snapshot()
+            if snapshot is not None:
+                return snapshot
+            return self._build_catalog_snapshot()
+
+    def _fresh_snapshot(self) -> Optional[CatalogSnapshot]:
+        snapshot = _catalog_snapshots.get(self.brand_id)
+        if (
+            snapshot is not None
+            and snapshot.version == self.catalog_version
+            and time.monotonic() - snapshot.loaded_at < CATALOG_SNAPSHOT_TTL_SECONDS
+        ):
+            return snapshot
+        return None
+
+    def _build_catalog_snapshot(self) -> CatalogSnapshot:
+        version = self.catalog_version
+        # Products and their aggregates are built in a single pass over the Chroma results
+        products = []
+        categories = set()
+        available_count = 0
+        try:
+            for product in self._iter_all_products():
+                products.append(product)
+                categories.add(product.category)
+                available_count += product.availability
+        except Exception:
+            logger.exception("Error getting all products")
+            return CatalogSnapshot(version, time.monotonic(), (), (), 0)
+        
+        snapshot = CatalogSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            products=tuple(products),
+            categories=tuple(sorted(categories)),
+            available_count=available_count
+        )
+        _catalog_snapshots[self.brand_id] = snapshot
+        return snapshot
+
+    def get_catalog_counts(self) -> CatalogCounts:
+        """Category and availability counts, read from Chroma metadata only when missing or expired"""
+        counts = _catalog_counts.get(self.brand_id)
+        if counts is not None and time.monotonic() - counts.loaded_at < CATALOG_SNAPSHOT_TTL_SECONDS:
+            return counts
+        
+        loaded_at = time.monotonic()
+        results = self.collection.get(where={"brand_id": self.brand_id}, include=["metadatas"])
+        categories = Counter()
+        available = 0
+        for metadata in results['metadatas']:
+            categories[metadata.get("category")] += 1
+            available += bool(metadata.get("availability"))
+        counts = CatalogCounts(loaded_at, categories, available)
+        _catalog_counts[self.brand_id] = counts
+        return counts
+
+    def get_categories(self) -> Tuple[str, ...]:
+        """Sorted categories that have at least one product"""
+        return tuple(sorted(self.get_catalog_counts().categories))
+
     def update_product(self, product: Product) -> bool:
         """Update a product in the vector store"""
         try:
-            # Delete existing product
-            self.collection.delete(ids=[f"{self.brand_id}_{product.id}"])
-            # Add updated product
-            return self.add_product(product)
-        except Exception as e:
-            print(f"Error updating product: {e}")
+            stored_id = f"{self.brand_id}_{product.id}"
+            removed = list(self._get_stored_metadata([stored_id]).values())
+            document = self.prepare_product_text(product)
+            # One upsert replaces the old entry, so the product is never missing mid-update
+            self.collection.upsert(
+                embeddings=get_document_embedding_cache().embed_many([document], self._embed_documents),
+                documents=[document],
+                metadatas=[self._product_metadata(product)],
+                ids=[stored_id]
+            )
+            self._adjust_counts(added=[product], removed=removed)
+            self._bump_catalog_version()
+            return True
+        except Exception:
+            logger.exception("Error updating product")
             return False
 
     def delete_product(self, product_id: str) -> bool:
         """Delete a product from the vector store"""
         try:
-            self.collection.delete(ids=[f"{self.brand_id}_{product_id}"])
+            stored_id = f"{self.brand_id}_{product_id}"
+            removed = list(self._get_stored_metadata([stored_id]).values())
+            self.collection.delete(ids=[stored_id])
+            self._adjust_counts(removed=removed)
+            self._bump_catalog_version()
             return True
-        except Exception as e:
-            print(f"Error deleting product: {e}")
+        except Exception:
+            logger.exception("Error deleting product")
             return False
 
     @classmethod
@@ -175,15 +497,17 @@ class VectorStore:
                     brand_id = collection.name.replace("products_", "")
                     brand_ids.append(brand_id)
             return brand_ids
-        except Exception as e:
-            print(f"Error getting brand collections: {e}")
+        except Exception:
+            logger.exception("Error getting brand collections")
             return []
 
     def delete_brand_collection(self) -> bool:
         """Delete all products for this brand"""
         try:
             self.client.delete_collection(name=self.collection_name)
+            _catalog_counts.pop(self.brand_id, None)
+            self._bump_catalog_version()
             return True
-        except Exception as e:
-            print(f"Error deleting brand collection: {e}")
+        except Exception:
+            logger.exception("Error deleting brand collection")
             return False 
\ No newline at end of file